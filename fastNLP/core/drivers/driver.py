@@ -13,6 +13,7 @@ __all__ = [
 ]
 
 from fastNLP.core.utils import nullcontext
+from fastNLP.envs.env import FASTNLP_NO_SYNC
 
 
 class Driver(ABC):
@@ -24,6 +25,12 @@ class Driver(ABC):
         :class:`torch.nn.parallel.DistributedDataParallel` 包裹过的模型。
     """
 
+    # 单卡 driver 的默认取值；分布式 driver 会在 setup 时覆盖这些实例属性。
+    # 直接声明为类属性可以避免在 on_exception 等路径上使用带默认值的 getattr。
+    global_rank: int = 0
+    local_rank: int = 0
+    world_size: int = 1
+
     def __init__(self, model):
         self.model = model
 
@@ -31,6 +38,11 @@ class Driver(ABC):
         # self._consensus_file: Optional[Union[str, Path]] = None
         self._pids: Optional[List[int]] = None
 
+        # 若启动时 FASTNLP_NO_SYNC 已经不小于 1，则整个运行期间 barrier 均为 no-op，缓存为布尔值以避免每次
+        # 调用 barrier 都读取 os.environ；启动时为 0 的情况仍需逐次检查环境变量，因为 rank_zero_call /
+        # all_rank_call_context 会在运行中临时改变该值；
+        self._no_sync_barrier = int(os.environ.get(FASTNLP_NO_SYNC, '0')) >= 1
+
     @abstractmethod
     def setup(self):
         r"""
@@ -127,46 +139,6 @@ class Driver(ABC):
         """
         raise NotImplementedError("Each specific driver should implemented its own `get_model_call_fn` function.")
 
-    @property
-    def model(self):
-        r"""
-        :return:  driver 中在实际训练或者评测时所使用的模型。
-        """
-        return self._model
-
-    @model.setter
-    def model(self, model):
-        self._model = model
-
-    @property
-    def optimizers(self) -> List:
-        r"""
-        如下所示，driver 返回的 :attr:`optimizers` 一定是一个 :class:`List`，如果用户直接向 :class:`~fastNLP.core.controllers.Trainer` 传入一个单独的 optimizer，
-        我们会使用一个 List 将其包裹；
-
-        :return: List[optimizer0, optimizer1, optimizer2, ...]
-        """
-        return self._optimizers
-
-    @optimizers.setter
-    def optimizers(self, optimizers):
-        if not isinstance(optimizers, Sequence):
-            self._optimizers = [optimizers]
-        else:
-            self._optimizers = optimizers
-        self._check_optimizer_legality(self._optimizers)
-
-    @property
-    def model_device(self):
-        r"""
-        :return: driver 中模型实际所在的设备。
-        """
-        return self._model_device
-
-    @model_device.setter
-    def model_device(self, model_device):
-        self._model_device = model_device
-
     @property
     def data_device(self):
         """
@@ -193,8 +165,13 @@ class Driver(ABC):
 
     def set_optimizers(self, optimizers=None):
         r"""
-        trainer 会调用该函数将用户传入的 ``optimizers`` 挂载到 driver 实例上。
+        trainer 会调用该函数将用户传入的 ``optimizers`` 挂载到 driver 实例上；挂载后的 :attr:`optimizers` 一定是一个
+        :class:`List`，如果用户直接向 :class:`~fastNLP.core.controllers.Trainer` 传入一个单独的 optimizer，我们会使用
+        一个 List 将其包裹。
         """
+        if not isinstance(optimizers, Sequence):
+            optimizers = [optimizers]
+        self._check_optimizer_legality(optimizers)
         self.optimizers = optimizers
 
     @abstractmethod
@@ -239,19 +216,6 @@ class Driver(ABC):
         """
         return nullcontext
 
-    @property
-    def auto_cast(self):
-        r"""
-        fp16 的上下文环境。
-
-        :return: 一个用于 fp16 计算的上下文环境
-        """
-        return self._auto_cast
-
-    @auto_cast.setter
-    def auto_cast(self, auto_cast):
-        self._auto_cast = auto_cast
-
     @abstractmethod
     def save_model(self, filepath: Union[str, Path, BytesIO], only_state_dict: bool = True, **kwargs):
         r"""
@@ -412,7 +376,7 @@ class Driver(ABC):
                 'exc_type': str(exc_type.__name__),
                 'exc_value': str(exc_value),
                 'exc_time': str(datetime.now().strftime('%Y-%m-%d-%H:%M:%S')),
-                'exc_global_rank': getattr(self, "global_rank", None),
+                'exc_global_rank': self.global_rank,
                 'exc_local_rank': self.get_local_rank(),
             }
             sys.stderr.write("\nException info:\n")
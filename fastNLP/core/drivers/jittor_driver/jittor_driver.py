@@ -69,7 +69,7 @@ class JittorDriver(Driver):
         else:
             jt.flags.auto_mixed_precision_level = 0
         self.fp16 = fp16
-        self._auto_cast = nullcontext
+        self.auto_cast = nullcontext
         self._jittor_kwargs = jittor_kwargs if jittor_kwargs is not None else {}
 
         # 用来设置是否关闭 auto_param_call 中的参数匹配问题；
@@ -1,3 +1,4 @@
+import inspect
 from typing import Dict, Union, Tuple, Callable, Optional
 
 from .jittor_driver import JittorDriver
@@ -49,9 +50,8 @@ class JittorSingleDriver(JittorDriver):
 
         self.model_device = device if device is not None else "cpu"
 
-        self.local_rank = 0
-        self.global_rank = 0
-        self.world_size = 1
+        # (id(fn), id(signature_fn)) -> (参数名元组, 无默认值的参数名集合)；避免每个 batch 都重新 inspect 签名；
+        self._sig_cache: Dict[Tuple[int, int], Tuple[tuple, frozenset]] = {}
 
     def setup(self):
         r"""
@@ -64,6 +64,22 @@ class JittorSingleDriver(JittorDriver):
 
     def model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
         if isinstance(batch, Dict) and not self.wo_auto_param_call:
+            key = (id(fn), id(signature_fn))
+            cached = self._sig_cache.get(key)
+            if cached is None:
+                res = auto_param_call(fn, batch, signature_fn=signature_fn)
+                params = inspect.signature(fn if signature_fn is None else signature_fn).parameters
+                # 含有 **kwargs 的函数每次都需要完整的 batch，不做缓存；
+                if not any(p.kind == p.VAR_KEYWORD for p in params.values()):
+                    names = tuple(params)
+                    required = frozenset(n for n, p in params.items() if p.default is p.empty)
+                    self._sig_cache[key] = (names, required)
+                return res
+            names, required = cached
+            kwargs = {name: batch[name] for name in names if name in batch}
+            if required <= kwargs.keys():
+                return fn(**kwargs)
+            # batch 的 keys 发生变化导致缺少必需参数时回退，以获得 auto_param_call 一致的报错信息；
             return auto_param_call(fn, batch, signature_fn=signature_fn)
         else:
             return fn(batch)
@@ -301,6 +301,8 @@ class OneflowDDPDriver(OneflowDriver):
         r"""
         同步各个进程之间的操作
         """
+        if self._no_sync_barrier:
+            return
         if int(os.environ.get(FASTNLP_NO_SYNC, 0)) < 1:  # 当 FASTNLP_NO_SYNC 小于 1 时实际执行
             comm.barrier()
 
@@ -1,6 +1,9 @@
 import io
 import pickle
+import struct
 import os
+import sys
+import threading
 from typing import Any, List
 
 import numpy as np
@@ -11,6 +14,11 @@ from fastNLP.core.utils import paddle_move_data_to_device
 if _NEED_IMPORT_PADDLE:
     import paddle
     import paddle.distributed as dist
+    try:
+        # 2.3 之后才提供的 flat 输出版本 all_gather；
+        from paddle.distributed import stream as dist_stream
+    except ImportError:
+        dist_stream = None
     from paddle.framework.io import (
         _is_state_dict,
         _build_saved_state_dict,
@@ -35,22 +43,65 @@ def _validate_output_list_for_rank(my_rank, dst, gather_list):
             "on non-destination ranks."
         )
 
+# protocol 5 分帧格式的魔数；普通 pickle 流以 b'\x80' 开头，不会与之冲突；
+_OOB_MAGIC = b'FNP5'
+
+# all_gather_object 快速路径的固定载荷上界与长度前缀（4 字节小端 uint32）；
+_FAST_PATH_BOUND = 4096
+_LEN_PREFIX = 4
+# broadcast 只有 src 一端发送数据，上界可以取得更宽松一些；
+_BCAST_FAST_PATH_BOUND = 65536
+
 def paddle_pickle_dump(obj, stream, protocol):
     """
     Reference to `paddle.save`
     """
-    if _is_state_dict(obj):
+    # _is_state_dict 会递归遍历整个对象，非 dict 的对象直接走普通路径，省掉这次遍历；
+    # protocol 5 的 out-of-band buffer 需要 python>=3.8，低版本退回原有路径
+    # （读端按 _OOB_MAGIC 嗅探格式，两种流都能解析）；
+    if sys.version_info >= (3, 8) and isinstance(obj, dict) and _is_state_dict(obj):
         saved_obj = _build_saved_state_dict(obj)
         saved_obj = _unpack_saved_dict(saved_obj, protocol)
-        pickle.dump(saved_obj, stream, protocol=protocol)
+        # state_dict 此时已全部转为 ndarray，使用 protocol 5 的 out-of-band buffer 跳过 pickler
+        # 内部对每个 ndarray 数据段的复制，把原始缓冲按「长度前缀 + 数据」直接写入 stream；
+        # 该格式仅由本模块的 paddle_pickle_load 解析，不落盘；
+        buffers: List[pickle.PickleBuffer] = []
+        header = pickle.dumps(saved_obj, protocol=5, buffer_callback=buffers.append)
+        stream.write(_OOB_MAGIC)
+        stream.write(struct.pack('<Q', len(header)))
+        stream.write(header)
+        stream.write(struct.pack('<Q', len(buffers)))
+        for buffer in buffers:
+            raw = buffer.raw()
+            stream.write(struct.pack('<Q', raw.nbytes))
+            stream.write(raw)
     else:
+        # paddle 的 _pickle_save 仅支持到 protocol 4；
         _pickle_save(obj, stream, protocol)
 
-def paddle_pickle_load(stream):
+def paddle_pickle_load(data):
     """
     Reference to `paddle.load`
+
+    :param data: 序列化后的 ``bytes``；直接使用 C 实现的 ``pickle.loads``，省去 ``BytesIO`` 包装。
     """
-    load_result = pickle.load(stream)
+    if data[:len(_OOB_MAGIC)] == _OOB_MAGIC:
+        offset = len(_OOB_MAGIC)
+        header_size, = struct.unpack_from('<Q', data, offset)
+        offset += 8
+        header = data[offset:offset + header_size]
+        offset += header_size
+        num_buffers, = struct.unpack_from('<Q', data, offset)
+        offset += 8
+        buffers = []
+        for _ in range(num_buffers):
+            buffer_size, = struct.unpack_from('<Q', data, offset)
+            offset += 8
+            buffers.append(data[offset:offset + buffer_size])
+            offset += buffer_size
+        load_result = pickle.loads(header, buffers=buffers)
+    else:
+        load_result = pickle.loads(data)
     if isinstance(load_result, dict):
         load_result = _pack_loaded_dict(load_result)
         if "StructuredToParameterName@@" in load_result:
@@ -70,20 +121,70 @@ def paddle_pickle_load(stream):
 
     return load_result
 
+# paddle 的 _pickle_save 仅支持 2 <= protocol <= 4，因此这里取 4 而不是 pickle.HIGHEST_PROTOCOL；
+_PICKLE_PROTOCOL = 4
+
+# 序列化用的线程本地 scratch buffer，避免频繁 gather 时每次都新建 BytesIO；
+_pickle_scratch = threading.local()
+
+def _scratch_stream() -> io.BytesIO:
+    stream = getattr(_pickle_scratch, 'stream', None)
+    if stream is None:
+        stream = _pickle_scratch.stream = io.BytesIO()
+    else:
+        try:
+            stream.seek(0)
+            stream.truncate(0)
+        except BufferError:
+            # 上一次导出的 memoryview 仍被引用（例如异常回溯持有栈帧）时无法复用，退化为新建；
+            stream = _pickle_scratch.stream = io.BytesIO()
+    return stream
+
 def _object_to_tensor(obj, device=None):
-    f = io.BytesIO()
-    paddle_pickle_dump(obj, f, protocol=2)
-    byte_data = list(f.getvalue())
-    byte_tensor = paddle.to_tensor(byte_data, dtype=paddle.int32)
-    local_size = paddle.to_tensor([byte_tensor.numel()])
-    if device is not None:
-        byte_tensor = paddle_move_data_to_device(byte_tensor, device)
-        local_size = paddle_move_data_to_device(local_size, device)
+    # 本模块内的通信载荷从构建起就是 uint8，收发两端都不需要（也不应）再做 astype 转换；
+    f = _scratch_stream()
+    paddle_pickle_dump(obj, f, protocol=_PICKLE_PROTOCOL)
+    # getbuffer 返回底层缓冲区的零拷贝视图，配合 frombuffer 避免 getvalue 的整段复制；
+    byte_data = np.frombuffer(f.getbuffer(), dtype=np.uint8)
+    # 直接在目标设备上构建 tensor，而不是先建在 cpu 上再搬运一次；
+    byte_tensor = paddle.to_tensor(byte_data, place=device)
+    local_size = paddle.to_tensor([byte_tensor.numel()], place=device)
     return byte_tensor, local_size
 
 def _tensor_to_object(tensor, tensor_size):
-    buf = tensor.astype(paddle.uint8).detach().cpu().numpy().tobytes()[:tensor_size]
-    return paddle_pickle_load(io.BytesIO(buf))
+    tensor = tensor.detach()
+    # 已经在 cpu 上的 tensor（例如 broadcast 在 cpu group 上接收到的）无需再经过一次 D2H 拷贝；
+    if not tensor.place.is_cpu_place():
+        tensor = tensor.cpu()
+    buf = tensor.numpy().tobytes()[:tensor_size]
+    return paddle_pickle_load(buf)
+
+def _flat_all_gather_arrays(tensor, group=None) -> List:
+    """
+    对各 rank 等长的 1-D payload 做 all_gather，返回按 rank 切分的 numpy 数组列表。
+
+    新版 paddle 下使用 flat 输出的 ``stream.all_gather``：只分配一个 ``[world_size * numel]``
+    的输出 tensor，并用一次 D2H 拷贝整体取回，避免为每个 rank 单独分配输出；旧版 paddle 没有
+    该接口时退回为输出列表的形式。
+    """
+    if dist_stream is not None:
+        nranks = group.nranks if group is not None else dist.get_world_size()
+        numel = int(tensor.shape[0])
+        flat = paddle.empty([nranks * numel], dtype=tensor.dtype)
+        dist_stream.all_gather(flat, tensor, group=group, sync_op=True)
+        if not flat.place.is_cpu_place():
+            flat = flat.cpu()
+        arr = flat.numpy()
+        return [arr[i * numel:(i + 1) * numel] for i in range(nranks)]
+    output_tensors = []
+    dist.all_gather(output_tensors, tensor, group=group)
+    arrays = []
+    for output_tensor in output_tensors:
+        output_tensor = output_tensor.detach()
+        if not output_tensor.place.is_cpu_place():
+            output_tensor = output_tensor.cpu()
+        arrays.append(output_tensor.numpy())
+    return arrays
 
 def fastnlp_paddle_gather_object(obj, dst=0, group=None):
     """
@@ -110,66 +211,86 @@ def fastnlp_paddle_gather_object(obj, dst=0, group=None):
     if int(os.environ.get(FASTNLP_NO_SYNC, '0')) == 2:
         return [obj]
 
-    if dist.get_rank() == dst:
-        object_gather_list = [None for _ in range(dist.get_world_size())]
-    else:
-        object_gather_list = None
-
     # if group is None:
         # TODO 2.2 版本存在 bug
         # group = dist.collective._get_global_group()
 
+    # 快速出口放在任何 tensor 相关工作之前；非 dst rank 不分配 gather list；
     if group is not None and not group.is_member():
         return
 
-    # Ensure object_gather_list is specified appopriately.
     my_rank = dist.get_rank()
+    if my_rank == dst:
+        object_gather_list = [None for _ in range(dist.get_world_size())]
+    else:
+        object_gather_list = None
+
+    # Ensure object_gather_list is specified appopriately.
     _validate_output_list_for_rank(my_rank, dst, object_gather_list)
     # 防止 unpickle 的时候出现在了发送的 gpu 上。
     obj = paddle_move_data_to_device(obj, device="cpu")
-    input_tensor, local_size = _object_to_tensor(obj)
-    # 目前 paddle 的 group 仅支持 nccl
-    input_tensor = paddle_move_data_to_device(input_tensor, device=paddle.device.get_device())
-    local_size = paddle_move_data_to_device(local_size, device=paddle.device.get_device())
-
-    # 收集所有的 local_size，找到最大的 size
-    object_size_list = []
-    dist.all_gather(object_size_list, local_size, group=group)
-    max_object_size = int(max(object_size_list).item())  # type: ignore[type-var]
-    input_tensor.reshape_(max_object_size)
-    # TODO 暂时没有在 paddle 中发现类似 torch.distributed.gather 的函数
-    output_tensors = []
-    dist.all_gather(output_tensors, input_tensor, group)
-    if my_rank != dst:
-        return
-    for i, tensor in enumerate(output_tensors):
-        tensor = tensor.astype(paddle.uint8)
-        tensor_size = object_size_list[i]
-        object_gather_list[i] = _tensor_to_object(tensor, tensor_size)
+    # get_device 每次都要解析配置，整个函数内只取一次；
+    current_device = paddle.device.get_device()
+    # 目前 paddle 的 group 仅支持 nccl；直接在目标设备上构建 tensor，省去两次单独的 H2D 拷贝；
+    input_tensor, local_size = _object_to_tensor(obj, device=current_device)
 
-def send_recv_object(obj, src, cur_rank, device, group=None, use_calc_stream=True):
+    # 用一次单元素的 Allreduce-MAX 代替收集全部 size 的 all_gather；各 rank 的真实长度由载荷
+    # 头部的 4 字节前缀携带，dst 端据此切片，因此不再需要逐 rank 的 size 列表；
+    # 本地长度直接读 shape，避免对 size 标量做一次 D2H 同步；
+    local_len = int(input_tensor.shape[0])
+    max_size = local_size.clone()
+    dist.all_reduce(max_size, op=dist.ReduceOp.MAX, group=group)
+    max_object_size = int(max_size.item())
+
+    # 扩展到最大长度；尾部内容不会被读取（dst 端按真实长度切片），用 empty + 切片赋值代替 pad；
+    tensor_padded = paddle.empty([_LEN_PREFIX + max_object_size], dtype=input_tensor.dtype)
+    header = paddle.to_tensor(np.frombuffer(struct.pack('<I', local_len), dtype=np.uint8))
+    tensor_padded[:_LEN_PREFIX] = paddle_move_data_to_device(header, current_device)
+    tensor_padded[_LEN_PREFIX:_LEN_PREFIX + local_len] = input_tensor
+    # TODO 暂时没有在 paddle 中发现类似 torch.distributed.gather 的函数
+    if dist_stream is not None:
+        # flat 输出版本：单个输出 tensor，且非 dst rank 无需做 D2H 拷贝；
+        nranks = group.nranks if group is not None else dist.get_world_size()
+        flat_len = _LEN_PREFIX + max_object_size
+        flat = paddle.empty([nranks * flat_len], dtype=tensor_padded.dtype)
+        dist_stream.all_gather(flat, tensor_padded, group=group, sync_op=True)
+        if my_rank != dst:
+            return
+        if not flat.place.is_cpu_place():
+            flat = flat.cpu()
+        flat_arr = flat.numpy()
+        arrays = [flat_arr[i * flat_len:(i + 1) * flat_len] for i in range(nranks)]
+    else:
+        output_tensors = []
+        dist.all_gather(output_tensors, tensor_padded, group)
+        if my_rank != dst:
+            return
+        arrays = [tensor.detach().cpu().numpy() for tensor in output_tensors]
+    for i, arr in enumerate(arrays):
+        tensor_size = int(struct.unpack('<I', arr[:_LEN_PREFIX].tobytes())[0])
+        buf = arr[_LEN_PREFIX:_LEN_PREFIX + tensor_size].tobytes()
+        object_gather_list[i] = paddle_pickle_load(buf)
+
+def send_recv_object(obj, src, cur_rank, device, group=None):
     # src rank send to all other ranks
     size = paddle_move_data_to_device(paddle.to_tensor([0]), device)
 
     if cur_rank == src:
-        world_size = dist.get_world_size()
         tensor, size = _object_to_tensor(obj)
         tensor = tensor.to(device)
         size = size.to(device)
 
         # 首先同步 obj 的 size 的信息；
         dist.broadcast(size, src, group=group)
-        for subrank in range(world_size):
-            if subrank != src:
-                dist.send(tensor=tensor, dst=subrank, group=group, use_calc_stream=use_calc_stream)
     else:
         dist.broadcast(size, src, group=group)
-        tensor = paddle_move_data_to_device(paddle.to_tensor([0] * size), device)
-        dist.recv(tensor=tensor, src=src, group=group, use_calc_stream=use_calc_stream)
+        tensor = paddle_move_data_to_device(paddle.zeros([int(size.item())], dtype=paddle.uint8), device)
+    # 广播是 tree/ring 实现，代替逐个 rank 的点对点 send，避免发送端成为串行瓶颈；
+    dist.broadcast(tensor, src, group=group)
 
     return _tensor_to_object(tensor.cpu(), size)
 
-def fastnlp_paddle_all_gather(obj: Any, device=None, group=None) ->List:
+def fastnlp_paddle_all_gather(obj: Any, device=None, group=None, assume_equal_size: bool = False) ->List:
     """
     实现任何类型的数据都使用该接口可以进行 all_gather 操作。对于非 tensor 类型的数据，通过 pickle 序列化再反序列化的方式进行传输。
 
@@ -189,6 +310,9 @@ def fastnlp_paddle_all_gather(obj: Any, device=None, group=None) ->List:
         序列化之后进行传输。
     :param device: 当前该参数无意义。
     :param group:
+    :param assume_equal_size: 当调用者可以保证 ``obj`` 在所有 rank 上序列化后的长度完全一致时（例如固定 schema 的
+        metric 结果），可以设置为 ``True`` 来跳过 size 交换，只用一次 all_gather 完成传输；若长度实际不一致，
+        行为未定义（可能 hang 或反序列化失败）。
     :return: 返回的结果是 [obj0, obj1, ...]，其中 obj_i 即为第 i 个 rank 上的 obj 。
     """
     if int(os.environ.get(FASTNLP_NO_SYNC, '0')) == 2:
@@ -200,6 +324,12 @@ def fastnlp_paddle_all_gather(obj: Any, device=None, group=None) ->List:
     if isinstance(obj, paddle.Tensor):
         objs = []
         dist.all_gather(objs, obj, group=group)
+    elif assume_equal_size:
+        # 防止 unpickle 的时候弄到发送的 gpu 上了
+        obj = paddle_move_data_to_device(obj, "cpu")
+        input_tensor, _ = _object_to_tensor(obj, device=paddle.device.get_device())
+        arrays = _flat_all_gather_arrays(input_tensor, group=group)
+        objs = [paddle_pickle_load(arr.tobytes()) for arr in arrays]
     else:
         objs = [None for _ in range(dist.get_world_size())]
         # 防止 unpickle 的时候弄到发送的 gpu 上了
@@ -209,6 +339,24 @@ def fastnlp_paddle_all_gather(obj: Any, device=None, group=None) ->List:
     return objs
 
 
+def fastnlp_paddle_all_gather_many(objs: List[Any], device=None, group=None) -> List[List]:
+    """
+    将多个独立的对象合并为一次 all_gather 进行传输，以摊薄每次 NCCL 集合通信的固定开销；
+    等价于对每个 obj 分别调用 :func:`fastnlp_paddle_all_gather` ，但无论多少个对象都只发起一对集合通信。
+
+    :param objs: 需要进行 all_gather 的对象列表，对象需要可以被 pickle 序列化。
+    :param device: 当前该参数无意义。
+    :param group:
+    :return: 与 ``objs`` 等长的列表，第 i 个元素为 [obj_i@rank0, obj_i@rank1, ...]。
+    """
+    if int(os.environ.get(FASTNLP_NO_SYNC, '0')) == 2:
+        return [[obj] for obj in objs]
+
+    # pickle 本身即是分帧格式，把对象打包成 tuple 后整体 gather 一次即可，无需额外的长度表；
+    gathered = fastnlp_paddle_all_gather(tuple(objs), device=device, group=group)
+    return [list(per_obj) for per_obj in zip(*gathered)]
+
+
 def fastnlp_paddle_broadcast_object(obj, src, device=None, group=None):
     """
     将 src 上的 obj 对象广播到其它 rank 上。
@@ -233,20 +381,35 @@ def fastnlp_paddle_broadcast_object(obj, src, device=None, group=None):
     if device is None:
         device = paddle.device.get_device()
 
+    # 第一轮广播一个固定上界的载荷，前 4 字节携带真实长度：小对象只需这一次 broadcast 即可完成
+    # size 交换与数据传输；大对象再按精确尺寸进行第二次 broadcast，次数与原先持平；
     if cur_rank == src:
         tensor, size = _object_to_tensor(obj, device=device)
+        # 长度直接读 shape，避免对 size 标量做一次 D2H 同步；
+        local_len = int(tensor.shape[0])
+        first_round = paddle_move_data_to_device(paddle.zeros([_BCAST_FAST_PATH_BOUND], dtype=paddle.uint8), device)
+        header = paddle.to_tensor(np.frombuffer(struct.pack('<I', local_len), dtype=np.uint8))
+        first_round[:_LEN_PREFIX] = paddle_move_data_to_device(header, device)
+        if local_len <= _BCAST_FAST_PATH_BOUND - _LEN_PREFIX:
+            first_round[_LEN_PREFIX:_LEN_PREFIX + local_len] = tensor
     else:
-        size = paddle_move_data_to_device(paddle.to_tensor([0]), device)
-
-    dist.broadcast(size, src=src, group=group)
+        first_round = paddle_move_data_to_device(paddle.empty([_BCAST_FAST_PATH_BOUND], dtype=paddle.uint8), device)
+    dist.broadcast(first_round, src=src, group=group)
+
+    arr = first_round.detach()
+    if not arr.place.is_cpu_place():
+        arr = arr.cpu()
+    arr = arr.numpy()
+    tensor_size = int(struct.unpack('<I', arr[:_LEN_PREFIX].tobytes())[0])
+    if tensor_size <= _BCAST_FAST_PATH_BOUND - _LEN_PREFIX:
+        return paddle_pickle_load(arr[_LEN_PREFIX:_LEN_PREFIX + tensor_size].tobytes())
+
+    # 大对象：长度已由头部携带，无需单独广播 size，直接按精确尺寸广播数据；
     if cur_rank != src:
-        tensor = paddle.empty(
-            size.astype(paddle.int32),  # type: ignore[arg-type]
-            dtype=paddle.int32,
-        )
+        tensor = paddle_move_data_to_device(paddle.empty([tensor_size], dtype=paddle.uint8), device)
     dist.broadcast(tensor, src=src, group=group)
 
-    return _tensor_to_object(tensor, tensor_size=size.item())
+    return _tensor_to_object(tensor, tensor_size=tensor_size)
 
 def all_gather_object(object_list, obj, group=None):
     """
@@ -270,33 +433,38 @@ def all_gather_object(object_list, obj, group=None):
 
     if group is not None and not group.is_member():
         return
-    
-    current_device = paddle.device.get_device()
 
-    input_tensor, local_size = _object_to_tensor(obj, device=current_device)
+    current_device = paddle.device.get_device()
 
-    # 聚合 tensor 的 size，找到最大的
-    object_size_list = []
-    # Allgather tensor sizes
-    dist.all_gather(object_size_list, local_size, group=group)
-    max_object_size = int(max(object_size_list).item())  # type: ignore[type-var]
-    # 将张量进行 pad
-    pad_dims = []
-    pad_by = (max_object_size - local_size).detach().cpu()
-    for val in reversed(pad_by):
-        pad_dims.append(0)
-        pad_dims.append(val.item())
-    tensor_padded = paddle.nn.functional.pad(input_tensor, pad_dims)
-
-    # Output tensors are nonoverlapping views of coalesced_output_tensor
-    output_tensors = []
-    dist.all_gather(output_tensors, tensor_padded, group=group)
-    dist.barrier()
+    input_tensor, _ = _object_to_tensor(obj, device=current_device)
+    # 长度直接读 shape，避免对 size 标量做一次 D2H 同步；
+    local_len = int(input_tensor.shape[0])
+
+    # 小对象快速路径：所有 rank 均发送一个固定上界大小的载荷，前 4 字节记录真实长度，
+    # 这样一次 all_gather 就能同时完成 size 交换与数据交换；只有在某个 rank 的载荷超出
+    # 上界时才需要第二轮按精确尺寸的 all_gather，且此时各 rank 的长度已经从头部得知；
+    first_round = paddle.zeros([_FAST_PATH_BOUND], dtype=paddle.uint8)
+    header = paddle.to_tensor(np.frombuffer(struct.pack('<I', local_len), dtype=np.uint8))
+    first_round[:_LEN_PREFIX] = paddle_move_data_to_device(header, current_device)
+    if local_len <= _FAST_PATH_BOUND - _LEN_PREFIX:
+        first_round[_LEN_PREFIX:_LEN_PREFIX + local_len] = input_tensor
+    arrays = _flat_all_gather_arrays(first_round, group=group)
+    lens = [int(struct.unpack('<I', arr[:_LEN_PREFIX].tobytes())[0]) for arr in arrays]
+    max_object_size = max(lens)
+    if max_object_size <= _FAST_PATH_BOUND - _LEN_PREFIX:
+        for i, arr in enumerate(arrays):
+            buf = arr[_LEN_PREFIX:_LEN_PREFIX + lens[i]].tobytes()
+            object_list[i] = paddle_pickle_load(buf)
+        return object_list
+
+    # 慢速路径：扩展到最大长度后进行第二轮 all_gather；尾部内容无意义（接收端只按真实长度切片），
+    # 因此用 empty + 切片赋值即可，省去 pad 核函数及其输出的额外清零；
+    tensor_padded = paddle.empty([max_object_size], dtype=input_tensor.dtype)
+    tensor_padded[:local_len] = input_tensor
+
+    # all_gather 本身即是所有 rank 的同步点，无需再追加一次 barrier；
+    arrays = _flat_all_gather_arrays(tensor_padded, group=group)
     # Deserialize outputs back to object.
-    for i, tensor in enumerate(output_tensors):
-        tensor = tensor.astype(paddle.uint8)
-        if not tensor.place.is_cpu_place():
-            tensor = tensor.cpu()
-        tensor_size = object_size_list[i]
-        object_list[i] = _tensor_to_object(tensor, tensor_size)
+    for i, arr in enumerate(arrays):
+        object_list[i] = paddle_pickle_load(arr[:lens[i]].tobytes())
     return object_list
\ No newline at end of file
@@ -65,6 +65,9 @@ r"""
 
 """
 import os
+import sys
+import multiprocessing
+from functools import cached_property
 from typing import List, Union, Optional, Dict, Tuple, Callable
 
 from .paddle_driver import PaddleDriver
@@ -75,7 +78,7 @@ from .utils import (
     replace_batch_sampler,
     _check_dataloader_args_for_distributed
 )
-from .dist_utils import fastnlp_paddle_all_gather, fastnlp_paddle_broadcast_object
+from .dist_utils import fastnlp_paddle_all_gather, fastnlp_paddle_broadcast_object, _flat_all_gather_arrays
 
 from fastNLP.envs.imports import _NEED_IMPORT_PADDLE
 from fastNLP.core.utils import (
@@ -83,6 +86,7 @@ from fastNLP.core.utils import (
     check_user_specific_params,
     is_in_paddle_dist,
     get_paddle_device_id,
+    paddle_move_data_to_device,
 )
 from fastNLP.core.utils.paddle_utils import _convert_data_device
 from fastNLP.envs.distributed import rank_zero_rm
@@ -114,10 +118,19 @@ if _NEED_IMPORT_PADDLE:
     from paddle.fluid.dygraph import parallel_helper
     from paddle.io import BatchSampler
 
+    # 合法的 optimizer 类型在导入时解析一次，校验时不必再走 fleet.meta_optimizers 的属性链；
+    # paddle 存在设置分布式 optimizers 的函数，返回值为 fleet.meta_optimizers.HybridParallelOptimizer
+    _LEGAL_OPTIMIZER_TYPES = (Optimizer, fleet.meta_optimizers.HybridParallelOptimizer)
+
 __all__ = [
     "PaddleFleetDriver",
 ]
 
+# 同一个进程内最多只会真正拉起一次子进程；这里以使用的设备为 key 记录第一次拉起时的
+# FleetLauncher（包括子进程句柄和 gloo 目录），供后续以相同设备创建的 PaddleFleetDriver
+# 复用（例如 Trainer -> Evaluator -> Trainer 的场景），避免重复初始化和资源泄漏。
+_FLEET_LAUNCHER_POOL: Dict[tuple, "FleetLauncher"] = {}
+
 class PaddleFleetDriver(PaddleDriver):
     """
     :param model: 训练使用的模型。
@@ -135,11 +148,15 @@ class PaddleFleetDriver(PaddleDriver):
             
             * *is_collective* -- 是否使用 paddle 集群式的分布式训练方法，目前仅支持为 ``True`` 的情况。
             * *role_maker* -- 初始化 ``fleet`` 分布式训练 API 时使用的 ``RoleMaker``。
+            * *comm_buffer_size* -- 反向传播中梯度 all-reduce 时每个通信桶的大小（单位 MB），默认为 **25**；
+              ``DataParallel`` 会按桶在反向计算的同时重叠地进行梯度通信。
             * 其它用于初始化 ``DataParallel`` 的参数。
         * *gradscaler_kwargs* -- 用于 ``fp16=True`` 时，提供给 :class:`paddle.amp.GradScaler` 的参数
     
     :kwargs:
         * *wo_auto_param_call* (``bool``) -- 是否关闭在训练时调用我们的 ``auto_param_call`` 函数来自动匹配 batch 和前向函数的参数的行为
+        * *jit_compile* (``bool``) -- 是否使用 :func:`paddle.jit.to_static` 将模型的前向捕获为静态图以进行算子融合，
+          默认为 ``False``。仅建议在每个 batch 形状都稳定的训练中开启，否则反复重新构图反而会拖慢训练。
 
         .. note::
 
@@ -174,6 +191,9 @@ class PaddleFleetDriver(PaddleDriver):
         # 这个参数会在 initialize_paddle_drvier 中设置。
         self.is_pull_by_paddle_run = is_pull_by_paddle_run
         self.parallel_device = parallel_device
+        # 子进程在拉起前就已经注入了 PADDLE_RANK_IN_NODE，因此这里读取一次并缓存即可，
+        # 不必在每次访问 local_rank 时都查询环境变量；
+        self._local_rank = int(os.getenv("PADDLE_RANK_IN_NODE", "0"))
         # 在初始化时，如果发现 is_pull_by_paddle_run ，则将 parallel_device 设置成当前进程的gpu
         if is_pull_by_paddle_run:
             self.model_device = parallel_device
@@ -205,6 +225,8 @@ class PaddleFleetDriver(PaddleDriver):
             raise NotImplementedError("fastNLP only support `collective` for distributed training now.")
         self.role_maker = self._fleet_kwargs.pop("role_maker", None)
 
+        self.jit_compile = kwargs.get("jit_compile", False)
+
         self.output_from_new_proc = kwargs.get("output_from_new_proc", "only_error")
         assert isinstance(self.output_from_new_proc, str), "Parameter `output_from_new_proc` can only be `str` type."
         if self.output_from_new_proc not in {"all", "ignore", "only_error"}:
@@ -213,6 +235,9 @@ class PaddleFleetDriver(PaddleDriver):
 
         self._has_setup = False # 设置这一参数是因为 evaluator 中也会进行 setup 操作，但是显然是不需要的也不应该的；
         self._has_fleetwrapped = False  # 判断传入的模型是否经过 _has_fleetwrapped 包裹；
+        self._resolved_data_device = None  # data_device 经 _convert_data_device 解析后的缓存；
+        self._meta_group = None  # 用于 PID 收集、barrier 等元数据通信的通信组，在 setup 中创建；
+        self._model_call_impl = self._plain_model_call  # model_call 的实际实现，setup 后按是否包裹绑定；
 
     def setup(self):
         """
@@ -237,11 +262,12 @@ class PaddleFleetDriver(PaddleDriver):
                 self.world_size = int(os.environ.get("PADDLE_TRAINERS_NUM"))
                 self.global_rank = int(os.environ.get("PADDLE_TRAINER_ID"))
                 logger.info(f"World size: {self.world_size}, Global rank: {self.global_rank}")
+                # 环境变量的写入统一放在 fleet.init 之前完成；init 过程中可能 fork 出
+                # 辅助进程，写在其后会让这些进程看不到（或race到一半的）环境变量；
+                os.environ["fastnlp_paddle_launch_not_fleet"] = "yes"
                 if not parallel_helper._is_parallel_ctx_initialized():
                     fleet.init(self.role_maker, self.is_collective, self.strategy)
 
-                os.environ["fastnlp_paddle_launch_not_fleet"] = "yes"
-
         else:
             # 在用户只使用了一个分布式 trainer 的情况下
             # 此时 parallel_helper._is_parallel_ctx_initialized() 一定为 False
@@ -260,27 +286,44 @@ class PaddleFleetDriver(PaddleDriver):
                                     "allowed that your second `PaddleFleetDriver` has a new setting of parameters `parallel_device`.")
                 self.world_size = paddledist.get_world_size()
                 self.global_rank = paddledist.get_rank()
+                # 复用第一次拉起时记录的 launcher 状态，保证异常时 gloo 目录能被清理
+                launcher = _FLEET_LAUNCHER_POOL.get(tuple(sorted(pre_gpus)))
+                if launcher is not None:
+                    self.gloo_rendezvous_dir = launcher.gloo_rendezvous_dir
 
         if not self.outside_fleet:
-            # self.model.to(self.model_device)
+            # 这里不需要显式地迁移模型：进程拉起前已经通过 CUDA_VISIBLE_DEVICES 把设备限制为
+            # 当前卡，paddle 会直接在该设备上创建参数，逐个 tensor 的搬运在这条路径上并不存在；
             self.configure_fleet()
 
+        # 为 PID 收集、barrier 等元数据通信创建单独的通信组，避免这些集合通信和梯度的
+        # all-reduce 在默认通信组上互相排队；
+        self._meta_group = paddledist.new_group(list(range(self.world_size)))
+
         self.barrier()
 
         # 初始化 self._pids，从而使得每一个进程都能接受到 rank0 的 send 操作；
-        # TODO 不用.to会怎么样？
-        self._pids = []
-        paddledist.all_gather(self._pids, paddle.to_tensor(os.getpid(), dtype="int32"))
-        # TODO LOCAL_WORLD_SIZE
-        local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE")) if "LOCAL_WORLD_SIZE" in os.environ else None
-        if local_world_size is None:
-            local_world_size = paddle.to_tensor(self.local_rank, dtype="int32")
-            paddledist.all_reduce(local_world_size, op=paddledist.ReduceOp.MAX)
-            local_world_size = local_world_size.item() + 1
+        # 将 pid 和 local_rank 拼成一个 payload 一次性 all_gather，既拿到了所有进程的 pid，
+        # 又能直接从 local_rank 推断 local_world_size，省去原来单独的一次 all_reduce；
+        # _flat_all_gather_arrays 会把所有 rank 的 payload 收进一块预分配的连续缓冲，
+        # 整体只有一次通信和一次 D2H 拷贝，无需为每个 rank 单独构造输出 tensor；
+        gathered = _flat_all_gather_arrays(paddle.to_tensor([os.getpid(), self.local_rank], dtype="int32"),
+                                           group=self._meta_group)
+        if "LOCAL_WORLD_SIZE" in os.environ:
+            local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE"))
+        else:
+            local_world_size = int(max(pair[1] for pair in gathered)) + 1
 
         node_rank = self.global_rank // local_world_size
-        self._pids = self._pids[node_rank*local_world_size: (node_rank+1)*local_world_size]
-        self._pids = self.tensor_to_numeric(self._pids)
+        self._pids = [int(pair[0]) for pair in gathered[node_rank*local_world_size: (node_rank+1)*local_world_size]]
+
+        # 是否经过 _FleetWrappingModel 包裹在 setup 之后不会再变化，这里将 model_call 的实现
+        # 一次性绑定好，训练热路径上无需再逐个 batch 地判断分支；
+        if self._has_fleetwrapped:
+            self._model_call_impl = self._wrapped_model_call
+
+        # fp16 时预热 scaler 和 auto_cast，使首个 step 不必承担它们的一次性初始化开销；
+        self._warmup_fp16()
 
     def _init_fleet_and_set(self):
         """
@@ -288,9 +331,13 @@ class PaddleFleetDriver(PaddleDriver):
         """
         if self.local_rank == 0:
             logger._set_distributed()
-            # 是 rank0 的话，则拉起其它子进程
-            launcher = FleetLauncher(self.parallel_device, self.output_from_new_proc)
-            launcher.launch()
+            # 是 rank0 的话，则拉起其它子进程；相同设备的 launcher 只会真正拉起一次
+            pool_key = tuple(sorted(get_paddle_device_id(g) for g in self.parallel_device))
+            launcher = _FLEET_LAUNCHER_POOL.get(pool_key)
+            if launcher is None:
+                launcher = FleetLauncher(self.parallel_device, self.output_from_new_proc)
+                launcher.launch()
+                _FLEET_LAUNCHER_POOL[pool_key] = launcher
             self.gloo_rendezvous_dir = launcher.gloo_rendezvous_dir
         # 设置参数和初始化分布式环境
         fleet.init(self.role_maker, self.is_collective, self.strategy)
@@ -314,14 +361,28 @@ class PaddleFleetDriver(PaddleDriver):
         """
         同步进程之间的操作
         """
+        if self._no_sync_barrier:
+            return
         if int(os.environ.get(FASTNLP_NO_SYNC, 0)) < 1:  # 当 FASTNLP_NO_SYNC 小于 1 时实际执行
-            paddledist.barrier()
+            paddledist.barrier(self._meta_group)
 
     def configure_fleet(self):
         # 将模型用 DataParallel 和自定义的类型包裹起来
         if not self._has_fleetwrapped and not isinstance(self.model, DataParallel):
+            # DataParallel 自身会为每个参数注册反向 hook，按桶在反向计算的同时重叠地 all-reduce
+            # 梯度；这里显式地给出桶大小（MB），用户可以通过 fleet_kwargs 调节以适配自己的带宽；
+            self._fleet_kwargs.setdefault("comm_buffer_size", 25)
+            if self.fp16:
+                # 混合精度下 auto_cast 覆盖的算子反向产生的梯度本身就是 fp16，DataParallel 的桶通信
+                # 会按梯度自身的 dtype 传输，因此这部分通信量已经减半，无需在 hook 中手动转换 dtype；
+                logger.debug("fp16 is enabled, gradients of amp-cast operators will be all-reduced in float16.")
+            wrapped_model = _FleetWrappingModel(self.model)
+            if self.jit_compile:
+                # to_static 会把动态图前向捕获为静态子图并做算子融合；首次执行会有构图开销
+                logger.info("Compiling the model with `paddle.jit.to_static`, the first batch may take longer.")
+                wrapped_model = paddle.jit.to_static(wrapped_model)
             self.model = DataParallel(
-                _FleetWrappingModel(self.model),
+                wrapped_model,
                 **self._fleet_kwargs
             )
             self._has_fleetwrapped = True
@@ -357,25 +418,41 @@ class PaddleFleetDriver(PaddleDriver):
         """
         当前进程的局部编号 ``local_rank``
         """
-        return int(os.getenv("PADDLE_RANK_IN_NODE", "0"))
+        return self._local_rank
 
-    @property
+    @cached_property
     def data_device(self):
         """
         数据所在的设备；由于 **PaddlePaddle** 可以通过环境变量获取当前进程的设备，因此该属性
-        和 ``model_device`` 表现相同。
+        和 ``model_device`` 表现相同。``model_device`` 在 ``__init__`` 之后不会再变化，因此
+        首次访问后直接缓存结果。
         """
         return self.model_device
 
+    def move_data_to_device(self, batch):
+        r"""
+        将数据集合 ``batch`` 迁移到数据所在的设备上。``data_device`` 在 ``setup`` 之后不会再变化，
+        因此这里只在第一个 batch 时通过 :func:`_convert_data_device` 解析一次设备，之后直接复用解析结果。
+
+        :param batch: 包含 :class:`paddle.Tensor` 的数据集合，可以是 **List**、**Dict** 等嵌套类型。
+        :return: 移动到指定机器后的 ``batch``。
+        """
+        if self._resolved_data_device is None:
+            self._resolved_data_device = _convert_data_device(self.data_device)
+        return paddle_move_data_to_device(batch, self._resolved_data_device)
+
     def model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
-        if self._has_fleetwrapped:
-            return self.model(batch, fastnlp_fn=fn, fastnlp_signature_fn=signature_fn,
-                              wo_auto_param_call=self.wo_auto_param_call)
+        return self._model_call_impl(batch, fn, signature_fn)
+
+    def _wrapped_model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
+        return self.model(batch, fastnlp_fn=fn, fastnlp_signature_fn=signature_fn,
+                          wo_auto_param_call=self.wo_auto_param_call)
+
+    def _plain_model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
+        if isinstance(batch, Dict) and not self.wo_auto_param_call:
+            return auto_param_call(fn, batch, signature_fn=signature_fn)
         else:
-            if isinstance(batch, Dict) and not self.wo_auto_param_call:
-                return auto_param_call(fn, batch, signature_fn=signature_fn)
-            else:
-                return fn(batch)
+            return fn(batch)
 
     def get_model_call_fn(self, fn: str) -> Tuple:
         model = self.unwrap_model()
@@ -406,6 +483,19 @@ class PaddleFleetDriver(PaddleDriver):
         # 暂时不支持iterableDataset
         assert dataloader.dataset_kind != _DatasetKind.ITER, \
                     "FastNLP does not support `IteratorDataset` now."
+        # paddle 的 DataLoader 在 Linux 上默认通过 fork 创建 worker 进程；分布式训练中主进程此时已经初始化
+        # 了 CUDA 上下文，fork 出的 worker 在第一次 CUDA 调用时可能长时间阻塞甚至出错，因此提醒用户改用 spawn；
+        start_method = multiprocessing.get_start_method(allow_none=True)
+        if start_method is None and sys.platform not in ("win32", "darwin"):
+            start_method = "fork"
+        if getattr(dataloader, "num_workers", 0) > 0 and start_method == "fork":
+            logger.rank_zero_warning(
+                "Your dataloader uses `num_workers > 0` while the multiprocessing start method is 'fork'. "
+                "Forked workers inheriting an initialized CUDA context may stall or fail on their first CUDA "
+                "call; consider calling `multiprocessing.set_start_method('spawn')` before building your "
+                "dataloaders.",
+                once=True
+            )
         # 如果 dist 为 ReproducibleBatchSampler, ReproducibleSampler 说明是在断点重训时 driver.load_checkpoint 函数调用；
         if isinstance(dist, ReproducibleBatchSampler):
             dist.set_distributed(
@@ -424,78 +514,12 @@ class PaddleFleetDriver(PaddleDriver):
 
        # 如果 dist 为 str 或者 None，说明是在 trainer 初试化时调用；
         # trainer, evaluator
-        if dist is None:
-            if reproducible:
-                raise RuntimeError("It is not allowed to save checkpoint if the sampler is not allowed to be replaced.")
-            else:
-                args = self.get_dataloader_args(dataloader)
-                if isinstance(args.batch_sampler, ReproducibleBatchSampler):
-                    batch_sampler = re_instantiate_sampler(args.batch_sampler)
-                    return replace_batch_sampler(dataloader, batch_sampler)
-                if isinstance(args.sampler, ReproducibleSampler):
-                    sampler = re_instantiate_sampler(args.sampler)
-                    return replace_sampler(dataloader, sampler)
-                return dataloader
-        # trainer
-        elif dist == "dist":
-            args = self.get_dataloader_args(dataloader)
-            # 如果用户的 trainer.use_dist_sampler 为 True，那么此时其是否进行断点重训，不影响这里的行为；
-            if isinstance(args.batch_sampler, ReproducibleBatchSampler):
-                batch_sampler = re_instantiate_sampler(args.batch_sampler)
-                batch_sampler.set_distributed(
-                    num_replicas=self.world_size,
-                    rank=self.global_rank,
-                    pad=True
-                )
-                return replace_batch_sampler(dataloader, batch_sampler)
-            elif isinstance(args.sampler, ReproducibleSampler):
-                sampler = re_instantiate_sampler(args.sampler)
-                sampler.set_distributed(
-                    num_replicas=self.world_size,
-                    rank=self.global_rank,
-                    pad=True
-                )
-                return replace_sampler(dataloader, sampler)
-            else:
-                _check_dataloader_args_for_distributed(args, controller='Trainer')
-                sampler = RandomSampler(
-                    dataset=args.dataset,
-                    shuffle=args.shuffle,
-                    seed=int(os.environ.get(FASTNLP_GLOBAL_SEED, 0))
-                )
-                sampler.set_distributed(
-                    num_replicas=self.world_size,
-                    rank=self.global_rank,
-                    pad=True
-                )
-                return replace_sampler(dataloader, sampler)
-        # evaluator
-        elif dist == "unrepeatdist":
-            args = self.get_dataloader_args(dataloader)
-            if type(args.batch_sampler) != BatchSampler:
-                # TODO 这里的目的是判断用户的 batch_sampler 是定制的，可能需要完善
-                logger.warning("Note that you are using customized ``batch_sampler`` in evaluate dataloader or" \
-                                "train dataloader while testing ``overfit_batches``, which may cause that" \
-                                "the data for distributed evaluation is not unrepeated.")
-            if isinstance(args.sampler, ReproducibleSampler):
-                sampler = conversion_between_reproducible_and_unrepeated_sampler(args.sampler)
-            elif not isinstance(args.sampler, UnrepeatedSampler):
-                _check_dataloader_args_for_distributed(args, controller='Evaluator')
-                sampler = UnrepeatedSequentialSampler(
-                    dataset=args.dataset
-                )
-            else:
-                sampler = re_instantiate_sampler(args.sampler)
-            sampler.set_distributed(
-                num_replicas=self.world_size,
-                rank=self.global_rank
-            )
-            # TODO 这里暂时统一替换为 BatchSampler
-            batch_sampler = BatchSampler(dataset=args.dataset, batch_size=args.batch_size, drop_last=False)
-            batch_sampler.sampler = sampler
-            return replace_batch_sampler(dataloader, batch_sampler)
-        else:
+        # 下面的每个分支都需要解析 dataloader 的参数，这里统一解析一次；
+        args = self.get_dataloader_args(dataloader)
+        handler = _DIST_SAMPLER_HANDLERS.get(dist) if (dist is None or isinstance(dist, str)) else None
+        if handler is None:
             raise ValueError("Parameter `dist_sampler` can only be one of three values: ('dist', 'unrepeatdist', None).")
+        return handler(self, dataloader, args, reproducible)
 
     def is_global_zero(self) -> bool:
         r"""
@@ -533,10 +557,8 @@ class PaddleFleetDriver(PaddleDriver):
 
     @staticmethod
     def _check_optimizer_legality(optimizers):
-        # paddle 存在设置分布式 optimizers 的函数，返回值为 fleet.meta_optimizers.HybridParallelOptimizer
-        DistribuedOptimizer = fleet.meta_optimizers.HybridParallelOptimizer
         for each_optimizer in optimizers:
-            if not isinstance(each_optimizer, (Optimizer, DistribuedOptimizer)):
+            if not isinstance(each_optimizer, _LEGAL_OPTIMIZER_TYPES):
                 raise ValueError(f"Each optimizer of parameter `optimizers` should be 'paddle.optimizer.Optimizer' type, "
                                 f"not {type(each_optimizer)}.")
 
@@ -551,9 +573,10 @@ class PaddleFleetDriver(PaddleDriver):
         :return: 如果当前 rank 是接收端，则返回接收到的参数；如果是 source 端则返回发送的内容。如果环境变量 ``FASTNLP_NO_SYNC`` 为 **2** 则
             返回 ``None``
         """
-        # 因为设置了CUDA_VISIBLE_DEVICES，可能会引起错误
-        device = _convert_data_device(self.data_device)
-        return fastnlp_paddle_broadcast_object(obj, src, device=device, group=group)
+        # 因为设置了CUDA_VISIBLE_DEVICES，可能会引起错误；解析的结果在进程内不会变化，因此只解析一次
+        if self._resolved_data_device is None:
+            self._resolved_data_device = _convert_data_device(self.data_device)
+        return fastnlp_paddle_broadcast_object(obj, src, device=self._resolved_data_device, group=group)
 
     def all_gather(self, obj, group=None) -> List:
         r"""
@@ -577,3 +600,81 @@ class PaddleFleetDriver(PaddleDriver):
         :return: 所有 rank 发送的 ``obj`` 聚合在一起的内容；如果环境变量 ``FASTNLP_NO_SYNC`` 为 **2** 则不会执行，直接返回 ``[obj]`` 。
         """
         return fastnlp_paddle_all_gather(obj, group=group)
+
+
+# set_dist_repro_dataloader 中 dist 为 None / "dist" / "unrepeatdist" 三种取值各自对应的处理函数；
+# 拆成查表分发后每种情况只剩一条直线代码路径；
+def _handle_dist_none(driver, dataloader, args, reproducible):
+    if reproducible:
+        raise RuntimeError("It is not allowed to save checkpoint if the sampler is not allowed to be replaced.")
+    if isinstance(args.batch_sampler, ReproducibleBatchSampler):
+        batch_sampler = re_instantiate_sampler(args.batch_sampler)
+        return replace_batch_sampler(dataloader, batch_sampler)
+    if isinstance(args.sampler, ReproducibleSampler):
+        sampler = re_instantiate_sampler(args.sampler)
+        return replace_sampler(dataloader, sampler)
+    return dataloader
+
+# trainer
+def _handle_dist(driver, dataloader, args, reproducible):
+    # 如果用户的 trainer.use_dist_sampler 为 True，那么此时其是否进行断点重训，不影响这里的行为；
+    if isinstance(args.batch_sampler, ReproducibleBatchSampler):
+        batch_sampler = re_instantiate_sampler(args.batch_sampler)
+        batch_sampler.set_distributed(
+            num_replicas=driver.world_size,
+            rank=driver.global_rank,
+            pad=True
+        )
+        return replace_batch_sampler(dataloader, batch_sampler)
+    elif isinstance(args.sampler, ReproducibleSampler):
+        sampler = re_instantiate_sampler(args.sampler)
+        sampler.set_distributed(
+            num_replicas=driver.world_size,
+            rank=driver.global_rank,
+            pad=True
+        )
+        return replace_sampler(dataloader, sampler)
+    else:
+        _check_dataloader_args_for_distributed(args, controller='Trainer')
+        sampler = RandomSampler(
+            dataset=args.dataset,
+            shuffle=args.shuffle,
+            seed=int(os.environ.get(FASTNLP_GLOBAL_SEED, 0))
+        )
+        sampler.set_distributed(
+            num_replicas=driver.world_size,
+            rank=driver.global_rank,
+            pad=True
+        )
+        return replace_sampler(dataloader, sampler)
+
+# evaluator
+def _handle_unrepeatdist(driver, dataloader, args, reproducible):
+    if type(args.batch_sampler) != BatchSampler:
+        # TODO 这里的目的是判断用户的 batch_sampler 是定制的，可能需要完善
+        logger.warning("Note that you are using customized ``batch_sampler`` in evaluate dataloader or" \
+                        "train dataloader while testing ``overfit_batches``, which may cause that" \
+                        "the data for distributed evaluation is not unrepeated.")
+    if isinstance(args.sampler, ReproducibleSampler):
+        sampler = conversion_between_reproducible_and_unrepeated_sampler(args.sampler)
+    elif not isinstance(args.sampler, UnrepeatedSampler):
+        _check_dataloader_args_for_distributed(args, controller='Evaluator')
+        sampler = UnrepeatedSequentialSampler(
+            dataset=args.dataset
+        )
+    else:
+        sampler = re_instantiate_sampler(args.sampler)
+    sampler.set_distributed(
+        num_replicas=driver.world_size,
+        rank=driver.global_rank
+    )
+    # TODO 这里暂时统一替换为 BatchSampler
+    batch_sampler = BatchSampler(dataset=args.dataset, batch_size=args.batch_size, drop_last=False)
+    batch_sampler.sampler = sampler
+    return replace_batch_sampler(dataloader, batch_sampler)
+
+_DIST_SAMPLER_HANDLERS = {
+    None: _handle_dist_none,
+    "dist": _handle_dist,
+    "unrepeatdist": _handle_unrepeatdist,
+}
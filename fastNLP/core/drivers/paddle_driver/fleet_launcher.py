@@ -3,6 +3,7 @@ import sys
 import __main__
 import tempfile
 import copy
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from fastNLP.core.drivers.utils import distributed_open_proc
@@ -65,6 +66,9 @@ class FleetLauncher:
     def open_subprocess(self):
         """
         从 sub_trainers 中获取各个 rank 的信息，并且使用 subprocess.Popen 建立新的子进程。
+
+        为了避免多卡时逐个 fork/exec 串行等待，这里先为每个 rank 准备好独立的环境变量副本，
+        再通过线程池并发地拉起所有子进程。
         """
 
         if __main__.__spec__ is None:
@@ -85,7 +89,8 @@ class FleetLauncher:
         else:  # Script called as `python -m a.b.c`
             command = [sys.executable, "-m", __main__.__spec__.name] + sys.argv[1:]
 
-        current_env = copy.copy(self.global_envs)
+        # 第一阶段：为每个 rank 构造独立的环境变量副本
+        child_envs = []
         for idx, t in enumerate(self.sub_trainers):
             # 根据不同的 rank 设置环境变量
             proc_env = {
@@ -104,6 +109,7 @@ class FleetLauncher:
                 proc_env["FLAGS_selected_devices"] = "%s" % ",".join(
                     [str(g) for g in t.devices])
 
+            current_env = copy.copy(self.global_envs)
             current_env.update(proc_env)
 
             if os.environ.get(FASTNLP_GLOBAL_SEED) is None and FASTNLP_GLOBAL_SEED in current_env:
@@ -113,11 +119,22 @@ class FleetLauncher:
                 # 子进程
                 if os.environ.get(FASTNLP_LOG_LEVEL, None) is None:
                     current_env[FASTNLP_LOG_LEVEL] = "warning"
-                proc = distributed_open_proc(self.output_from_new_proc, command, current_env, t.rank)
+                child_envs.append((current_env, t.rank))
             else:
                 # 更新当前的环境变量
                 os.environ.update(current_env)
 
+        # 第二阶段：并发地拉起所有子进程，各个 Popen 之间互不等待
+        self.procs = []
+        if len(child_envs) > 0:
+            with ThreadPoolExecutor(max_workers=min(64, len(child_envs))) as pool:
+                futures = [
+                    pool.submit(distributed_open_proc, self.output_from_new_proc, command, env, rank)
+                    for env, rank in child_envs
+                ]
+            # 在这里统一收集结果，若有子进程拉起失败则在此处抛出异常
+            self.procs = [f.result() for f in futures]
+
     def get_global_env(self):
         """
         设置分布式训练需要的全局变量，包括：
@@ -152,6 +169,9 @@ class FleetLauncher:
             "PADDLE_TRAINERS_NUM": f"{len(self.sub_trainers)}",
             "PADDLE_TRAINER_ENDPOINTS": ",".join(self.endpoints),
             "PADDLE_WORLD_DEVICE_IDS": ",".join(world_device_ids),
+            # launcher 只支持单机，节点内的进程数在这里就已经确定；导出后 driver 的
+            # setup 可以直接读取，不必再通过集合通信推断
+            "LOCAL_WORLD_SIZE": f"{len(self.sub_trainers)}",
         })
 
         return global_envs
@@ -16,6 +16,16 @@ if _NEED_IMPORT_PADDLE:
 
 __all__ = []
 
+_CUDA_DEVICE_COUNT = None
+
+def _get_cuda_device_count() -> int:
+    # device_count 每次调用都要查询 CUDA driver，而可见设备数在进程内不会变化，
+    # 因此只在第一次查询，之后复用缓存（evaluator 等场景会反复构建 driver）；
+    global _CUDA_DEVICE_COUNT
+    if _CUDA_DEVICE_COUNT is None:
+        _CUDA_DEVICE_COUNT = paddle.device.cuda.device_count()
+    return _CUDA_DEVICE_COUNT
+
 def initialize_paddle_driver(driver: str, device: Optional[Union[str, int, List[int]]],
                             model: "paddle.nn.Layer", **kwargs) -> PaddleDriver:
     r"""
@@ -48,7 +58,7 @@ def initialize_paddle_driver(driver: str, device: Optional[Union[str, int, List[
         return PaddleFleetDriver(model, device[0], True, **kwargs)
 
     if user_visible_devices is None:
-        _could_use_device_num = paddle.device.cuda.device_count()
+        _could_use_device_num = _get_cuda_device_count()
     else:
         _could_use_device_num = len(user_visible_devices.split(","))
 
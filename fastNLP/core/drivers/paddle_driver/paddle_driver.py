@@ -1,5 +1,7 @@
 import os
 import random
+import threading
+import weakref
 from typing import Union, Optional, Dict, Any
 from pathlib import Path
 from functools import partial
@@ -7,7 +9,8 @@ from dataclasses import dataclass
 
 import numpy as np
 
-from .utils import _build_fp16_env, optimizer_state_to_device, DummyGradScaler
+from .utils import _build_fp16_env, optimizer_state_to_device, DummyGradScaler, \
+    _save_tensor_dict_mmap, _load_tensor_dict_mmap
 from fastNLP.envs.imports import _NEED_IMPORT_PADDLE
 from fastNLP.core.drivers.driver import Driver
 from fastNLP.core.utils import apply_to_collection, paddle_move_data_to_device
@@ -45,6 +48,55 @@ if _NEED_IMPORT_PADDLE:
         "sum": paddle.sum
     }
 
+@dataclass
+class _DataLoaderArgs:
+    """:meth:`PaddleDriver.get_dataloader_args` 的解析结果。"""
+    dataset: Optional["Dataset"] = None
+    batch_sampler: Optional["BatchSampler"] = None
+    sampler: Optional["Sampler"] = None
+    batch_size: Optional[int] = None
+    shuffle: Optional[bool] = None
+    drop_last: Optional[bool] = None
+
+# get_dataloader_args 的结果缓存。fastNLP 替换 sampler 时总是重建一个新的 dataloader
+# 而不会原地修改旧的，因此按实例缓存是安全的；用弱引用保证不会延长 dataloader 的生命周期。
+_dataloader_args_cache = weakref.WeakKeyDictionary()
+
+# set_sampler_epoch 探测到的 set_epoch 绑定方法缓存（没有时为 None），与上面的缓存同理；
+_set_epoch_cache = weakref.WeakKeyDictionary()
+
+# _offload_state_dict_to_cpu 单次 concat 的字节预算；见该函数中的说明。
+_OFFLOAD_CONCAT_NBYTES = 256 * 1024 * 1024
+
+# 在途的后台 checkpoint 写盘线程；模块级共享：同一进程内先后存在的多个 driver（例如保存后
+# 立刻重建 Trainer 恢复断点）都要先等它结束，否则可能读到只写了一半的文件；
+_ckpt_write_thread = None
+
+def _start_ckpt_write(target, *args):
+    global _ckpt_write_thread
+    _wait_ckpt_write()
+    _ckpt_write_thread = threading.Thread(target=target, args=args)
+    _ckpt_write_thread.start()
+
+def _wait_ckpt_write():
+    global _ckpt_write_thread
+    if _ckpt_write_thread is not None:
+        _ckpt_write_thread.join()
+        _ckpt_write_thread = None
+
+def _batch_idx_in_epoch(total: int, num_left: int, batch_size: int, drop_last: bool) -> int:
+    """
+    根据 sampler 的样本总数与剩余样本数计算当前 epoch 已经产生的 batch 数。
+
+    :param total: sampler 中的样本总数，即 ``len(sampler)``；
+    :param num_left: sampler 尚未产生的样本数；
+    :param batch_size: 每个 batch 的样本数；
+    :param drop_last: 是否丢弃不足一个 batch 的尾部样本；
+    """
+    if drop_last:
+        return total // batch_size - num_left // batch_size
+    return (total + batch_size - 1) // batch_size - (num_left + batch_size - 1) // batch_size
+
 class PaddleDriver(Driver):
     r"""
     实现了 **PaddlePaddle** 框架训练功能的基本 Driver。
@@ -104,6 +156,17 @@ class PaddleDriver(Driver):
             self.grad_scaler.step(optimizer)
             self.grad_scaler.update()
 
+    def _warmup_fp16(self):
+        """
+        在正式训练开始前触发一次 ``auto_cast`` 与 scaler 的执行路径，把 scale 张量的分配、
+        kernel 的首次加载等一次性开销移出第一个 step；需要在设备设置完成之后调用。
+        """
+        if isinstance(self.grad_scaler, DummyGradScaler):
+            return
+        with self.auto_cast():
+            dummy = paddle.zeros([1], dtype="float32")
+        self.grad_scaler.scale(dummy)
+
     def check_dataloader_legality(self, dataloader):
         """
         检测 DataLoader 是否合法。支持的类型包括 :class:`~fastNLP.core.dataloaders.PaddleDataLoader`、 :class:`paddle.io.DataLoader` 。
@@ -115,7 +178,19 @@ class PaddleDriver(Driver):
         if dataloader.batch_size is None and dataloader.batch_sampler is None:
             raise ValueError("Please ensure at least one of your dataloader's batch_size and batch_sampler"
                             "is not None")
-        if len(dataloader) == 0:
+        # len(dataloader) 依赖 sampler 的 __len__，对自定义 sampler 可能是 O(N) 的；
+        # 优先用 O(1) 的数据集长度判断是否为空，只有 drop_last 可能丢弃全部样本时才计算 batch 数；
+        try:
+            num_samples = len(dataloader.dataset)
+        except TypeError:
+            num_samples = None
+        if num_samples is None:
+            is_empty = len(dataloader) == 0
+        elif num_samples == 0:
+            is_empty = True
+        else:
+            is_empty = getattr(dataloader, "drop_last", False) and len(dataloader) == 0
+        if is_empty:
             logger.rank_zero_warning("Your dataloader is empty, which is not recommended because it "
                                         "may cause some unexpected exceptions.", once=True)
 
@@ -143,14 +218,21 @@ class PaddleDriver(Driver):
         if tensor is None:
             return None
 
+        # 归一化函数只和 reduce 参数有关，在闭包外绑定一次，避免对集合中每个张量都做一次字典查找；
+        reducer = _reduces[reduce] if reduce is not None else None
+
         def _translate(_data):
             # 如果只含有一个元素，则返回元素本身，而非list
-            if _data.numel().item() == 1:
+            # 元素个数直接在 host 端由 shape 算出，numel().item() 会对每个 tensor 触发一次 D2H 同步
+            numel = 1
+            for s in _data.shape:
+                numel *= s
+            if numel == 1:
                 return _data.item()
-            if reduce is None:
+            if reducer is None:
                 return _data.tolist()
             else:
-                return _reduces[reduce](_data).item()
+                return reducer(_data).item()
 
         return apply_to_collection(
             data=tensor,
@@ -179,13 +261,22 @@ class PaddleDriver(Driver):
             * *input_spec* -- 描述存储模型 ``forward`` 方法的输入；
               当 ``only_state_dict`` 为 ``False`` 时必须传入，否则加载时会报错。您可以通过 ``InputSpec`` 或者示例 ``Tensor``
               进行描述。详细的使用方法可以参考 **PaddlePaddle** `关于 paddle.jit.save 函数的文档 <https://www.paddlepaddle.org.cn/documentation/docs/zh/api/paddle/jit/save_cn.html#save>`_。
+            * *use_safe_format* (``bool``) -- 仅在 ``only_state_dict`` 为 ``True`` 时有效；为 ``True`` 时
+              使用不经过 pickle 的扁平二进制格式保存，加载时可以通过 mmap 零拷贝读取，加载同一文件的
+              多个进程可以共享页缓存。注意该格式与 :func:`paddle.load` 不兼容，加载时也需要传入该参数。
         """
+        self._wait_checkpoint_write()
         model = self.unwrap_model()
         if isinstance(filepath, Path):
             filepath = str(filepath)
         if only_state_dict:
-            states = {name: param.cpu().detach().clone() for name, param in model.state_dict().items()}
-            paddle.save(states, filepath)
+            # .cpu() 本身就会为显存上的参数生成一份新的 host 拷贝，足够用于序列化；
+            # 再接 detach().clone() 只是徒增两次分配，使保存时的峰值内存翻倍；
+            states = apply_to_collection(model.state_dict(), dtype=paddle.Tensor, function=lambda t: t.cpu())
+            if kwargs.get("use_safe_format", False):
+                _save_tensor_dict_mmap(filepath, states)
+            else:
+                paddle.save(states, filepath)
         else:
             # paddle 在保存整个模型时需要传入额外参数
             input_spec = kwargs.get("input_spec", None)
@@ -199,26 +290,36 @@ class PaddleDriver(Driver):
 
         :param filepath: 保存文件的文件位置
         :param load_state_dict: 保存的内容是否只是权重。
+        :kwargs:
+            * *use_safe_format* (``bool``) -- 文件是否是 :meth:`save_model` 使用 ``use_safe_format=True``
+              保存的扁平二进制格式；为 ``True`` 时通过 mmap 零拷贝读取，仅在 ``only_state_dict``
+              为 ``True`` 时有效。
         """
+        self._wait_checkpoint_write()
         model = self.unwrap_model()
         if isinstance(filepath, Path):
             filepath = str(filepath)
+        if only_state_dict and kwargs.get("use_safe_format", False):
+            model.load_dict(_load_tensor_dict_mmap(filepath))
+            return
         # paddle 中，通过 paddle.jit.save 函数保存的模型也可以通过 paddle.load 加载为相应的 state dict
         # 但是此时对输入的 path 有要求，必须是 dir/filename 的形式，否则会报错。
         dirname, filename = os.path.split(filepath)
         if not only_state_dict and dirname == "":
             # 如果传入的是单个文件，则加上相对路径
             filepath = os.path.join(".", filepath)
-        model.load_dict(paddle.load(filepath))
+        # return_numpy=True 让反序列化直接产出 numpy 数组，load_dict 会把它们一次性
+        # 拷贝到参数所在设备，省去中间 CPU paddle.Tensor 的构造和一次额外拷贝；
+        model.load_dict(paddle.load(filepath, return_numpy=True))
 
     @rank_zero_call
     def save_checkpoint(self, folder: Path, states: Dict, dataloader, only_state_dict: bool = True, should_save_model: bool = True, **kwargs):
         r"""
         断点重训的保存函数，该函数会负责保存 **优化器** 、 **sampler** 和 **fp16** 的状态，以及 **模型** （若 ``should_save_model`` 为 ``True``）
 
-        :param folder: 保存断点重训的状态的文件夹；:meth:`save_checkpoint` 函数应该在该路径下面下面新增名为 ``FASTNLP_CHECKPOINT_FILENAME`` 与
-            ``FASTNLP_MODEL_FILENAME`` （如果 ``should_save_model`` 为 ``True`` ）的文件。把 model 相关的内容放入到 ``FASTNLP_MODEL_FILENAME`` 文件
-            中，将传入的 ``states`` 以及自身产生的其它状态一并保存在 ``FASTNLP_CHECKPOINT_FILENAME`` 里面。
+        :param folder: 保存断点重训的状态的文件夹；:meth:`save_checkpoint` 函数应该在该路径下面新增名为 ``FASTNLP_CHECKPOINT_FILENAME`` 的文件，
+            将传入的 ``states`` 、自身产生的其它状态、以及模型参数（如果 ``should_save_model`` 为 ``True`` 且 ``only_state_dict`` 为 ``True`` ）
+            一并保存在其中；``only_state_dict`` 为 ``False`` 时模型通过 :func:`paddle.jit.save` 单独保存为 ``FASTNLP_MODEL_FILENAME``。
         :param states: 由 :class:`~fastNLP.core.controllers.Trainer` 传入的一个字典，其中已经包含了为了实现断点重训所需要保存的其它对象的状态。
         :param dataloader: 正在使用的 dataloader。
         :param only_state_dict: 是否只保存模型的参数，当 ``should_save_model`` 为 ``False`` ，该参数无效。
@@ -254,7 +355,16 @@ class PaddleDriver(Driver):
 
         # 2. 保存模型的状态；
         if should_save_model:
-            self.save_model(folder.joinpath(FASTNLP_MODEL_FILENAME), only_state_dict, **kwargs)
+            if only_state_dict:
+                # 将模型参数并入 checkpoint 文件一起保存，整个断点只有一次序列化和一次写盘；
+                # 对元数据开销较大的集群文件系统尤为重要；
+                model = self.unwrap_model()
+                states["model_state_dict"] = apply_to_collection(model.state_dict(), dtype=paddle.Tensor,
+                                                                 function=lambda t: t.cpu())
+                logger.debug("Save model state dict.")
+            else:
+                # paddle.jit.save 有自己的文件布局，仍然单独保存；
+                self.save_model(folder.joinpath(FASTNLP_MODEL_FILENAME), only_state_dict, **kwargs)
 
         # 3. 保存 optimizers 的状态；
         states["optimizers_state_dict"] = self.get_optimizer_state()
@@ -265,16 +375,98 @@ class PaddleDriver(Driver):
             grad_scaler_state_dict = self.grad_scaler.state_dict()
             states['grad_scaler_state_dict'] = grad_scaler_state_dict
 
-        paddle.save(states, str(folder.joinpath(FASTNLP_CHECKPOINT_FILENAME)))
+        # states 中的 tensor 在上面已经整体搬到了 CPU，本身就是一份不会再被训练修改的快照，
+        # 因此序列化和写盘可以放到后台线程执行，让下一个训练 step 与持久化重叠；提交前会先
+        # join 上一次的写盘任务，保证同一时刻只有一个任务，避免 host 内存无限堆积；
+        _start_ckpt_write(paddle.save, states, str(folder.joinpath(FASTNLP_CHECKPOINT_FILENAME)))
+
+    @staticmethod
+    def _wait_checkpoint_write():
+        """
+        等待在途的后台 checkpoint 写盘任务完成（若有）。
+        """
+        _wait_ckpt_write()
 
     def get_optimizer_state(self):
         optimizers_state_dict = {}
         for i in range(len(self.optimizers)):
             optimizer: Optimizer = self.optimizers[i]
-            optimizers_state_dict[f"optimizer{i}"] = optimizer_state_to_device(optimizer.state_dict(), "cpu")
-        
+            optimizers_state_dict[f"optimizer{i}"] = self._offload_state_dict_to_cpu(optimizer.state_dict())
+
         return optimizers_state_dict
 
+    @staticmethod
+    def _offload_state_dict_to_cpu(state):
+        r"""
+        将一个 ``state_dict`` 整体搬到 CPU 上。
+
+        与 :func:`optimizer_state_to_device` 逐个 tensor 拷贝不同，这里先把同 dtype 的 GPU tensor
+        拼接成一个连续缓冲，每种 dtype 只做一次 D2H 拷贝，再在 host 端按原来的形状切分回去；
+        对于 Adam 这类每个参数都带多份动量的 optimizer，可以把 O(#tensors) 次小拷贝降为
+        O(#dtypes) 次大拷贝。
+
+        :param state: :func:`optimizer.state_dict` 获取的 state_dict。
+        :return: 迁移到 CPU 后的新的 state_dict。
+        """
+        leaves = []
+
+        def _clone_structure(node):
+            new_node = {}
+            for key, value in node.items():
+                if isinstance(value, dict):
+                    new_node[key] = _clone_structure(value)
+                elif isinstance(value, paddle.Tensor):
+                    new_node[key] = None
+                    leaves.append((new_node, key, value))
+                else:
+                    new_node[key] = value
+            return new_node
+
+        result = _clone_structure(state)
+
+        groups = {}
+        for container, key, tensor in leaves:
+            if tensor.place.is_cpu_place() or len(tensor.shape) == 0:
+                # 已经在 CPU 上的 tensor 以及 0-d tensor 单独处理
+                container[key] = tensor.cpu().clone() if not tensor.place.is_cpu_place() else tensor.clone()
+            else:
+                groups.setdefault(str(tensor.dtype), []).append((container, key, tensor))
+
+        def _offload_group(group):
+            if len(group) == 1:
+                container, key, tensor = group[0]
+                container[key] = tensor.cpu()
+                return
+            flat = paddle.concat([tensor.flatten() for _, _, tensor in group]).cpu()
+            offset = 0
+            for container, key, tensor in group:
+                numel = 1
+                for s in tensor.shape:
+                    numel *= s
+                container[key] = flat[offset:offset + numel].reshape(tensor.shape)
+                offset += numel
+
+        # concat 会在 GPU 上生成这一段 state 的连续副本，而 checkpoint 时 optimizer state
+        # 往往是显存大头；按固定字节预算切块 concat，峰值额外显存有界而不随模型规模增长；
+        for group in groups.values():
+            chunk = []
+            chunk_nbytes = 0
+            for container, key, tensor in group:
+                numel = 1
+                for s in tensor.shape:
+                    numel *= s
+                nbytes = numel * tensor.element_size()
+                if chunk and chunk_nbytes + nbytes > _OFFLOAD_CONCAT_NBYTES:
+                    _offload_group(chunk)
+                    chunk = []
+                    chunk_nbytes = 0
+                chunk.append((container, key, tensor))
+                chunk_nbytes += nbytes
+            if chunk:
+                _offload_group(chunk)
+
+        return result
+
     def load_optimizer_state(self, states):
         assert len(states) == len(self.optimizers), f"The number of optimizers is:{len(self.optimizers)}, while in " \
                                                     f"checkpoint it is:{len(states)}"
@@ -314,6 +506,8 @@ class PaddleDriver(Driver):
                 * drop_last 为 ``True`` 时，等同于 floor(sample_in_this_rank/batch_size) - floor(num_left_samples/batch_size)；
                 * drop_last 为 ``False`` 时，等同于 ceil(sample_in_this_rank/batch_size) - ceil(num_left_samples/batch_size)。
         """
+        # 若上一次 checkpoint 还在后台写盘，需要先等待其完成，保证读到的是完整的文件；
+        self._wait_checkpoint_write()
         states = paddle.load(str(folder.joinpath(FASTNLP_CHECKPOINT_FILENAME)))
 
         # 1. 加载 optimizers 的状态；
@@ -321,8 +515,14 @@ class PaddleDriver(Driver):
         self.load_optimizer_state(optimizers_state_dict)
 
         # 2. 加载模型状态；
+        model_states = states.pop("model_state_dict", None)
         if should_load_model:
-            self.load_model(folder.joinpath(FASTNLP_MODEL_FILENAME), only_state_dict)
+            if model_states is not None:
+                self.unwrap_model().load_dict(model_states)
+                logger.debug("Load model state dict.")
+            else:
+                # 旧版 checkpoint（或 only_state_dict=False）将模型单独保存为一个文件；
+                self.load_model(folder.joinpath(FASTNLP_MODEL_FILENAME), only_state_dict)
 
         # 3. 加载fp16的状态；
         if "grad_scaler_state_dict" in states:
@@ -358,12 +558,11 @@ class PaddleDriver(Driver):
         # 5. 修改 trainer_state.batch_idx_in_epoch
         # sampler 是类似 RandomSampler 的sampler，不是 batch_sampler；
         if not isinstance(sampler, ReproducibleBatchSampler):
-            if dataloader_args.drop_last:
-                batch_idx_in_epoch = len(
-                    sampler) // dataloader_args.batch_size - sampler.num_left_samples // dataloader_args.batch_size
-            else:
-                batch_idx_in_epoch = (len(sampler) + dataloader_args.batch_size - 1) // dataloader_args.batch_size - \
-                    (sampler.num_left_samples + dataloader_args.batch_size - 1) // dataloader_args.batch_size
+            # len(sampler) 对部分 sampler 可能是 O(N) 的，这里只读取一次；
+            batch_idx_in_epoch = _batch_idx_in_epoch(
+                len(sampler), sampler.num_left_samples,
+                dataloader_args.batch_size, dataloader_args.drop_last
+            )
         # sampler 是 batch_sampler；
         else:
             batch_idx_in_epoch = sampler.batch_idx_in_epoch
@@ -410,11 +609,44 @@ class PaddleDriver(Driver):
         return paddle_move_data_to_device(batch, device)
 
     @staticmethod
-    def worker_init_function(worker_id: int, rank: Optional[int] = None) -> None:  # pragma: no cover
+    def _compute_worker_seeds(base_seed: int, num_workers: int, global_rank: int):
+        """
+        在主进程中预先为每个 dataloader worker 推导随机种子。
+
+        SeedSequence 的哈希混合并不便宜，而 worker 的种子完全由 ``(base_seed, worker_id, global_rank)``
+        决定，因此在 fork 之前一次算好，worker 内只需三次 O(1) 的 seed 调用。
+        """
+        seeds = []
+        for worker_id in range(num_workers):
+            ss = np.random.SeedSequence([base_seed - worker_id, worker_id, global_rank])
+            # use 128 bits (4 x 32-bit words)
+            np_state = ss.generate_state(4)
+            paddle_ss, stdlib_ss = ss.spawn(2)
+            paddle_seed = int(paddle_ss.generate_state(1, dtype=np.uint64)[0])
+            # use 128 bits expressed as an integer
+            stdlib_seed = int((stdlib_ss.generate_state(2, dtype=np.uint64).astype(object) * [1 << 64, 1]).sum())
+            seeds.append((np_state, paddle_seed, stdlib_seed))
+        return seeds
+
+    @staticmethod
+    def worker_init_function(worker_id: int, rank: Optional[int] = None, seed_table=None,
+                             base_seed: Optional[int] = None) -> None:  # pragma: no cover
         # implementation notes: https://github.com/pytorch/pytorch/issues/5059#issuecomment-817392562
+        if seed_table is not None and worker_id < len(seed_table):
+            # 种子已经在主进程中算好，这里只做查表
+            np_state, paddle_seed, stdlib_seed = seed_table[worker_id]
+            np.random.seed(np_state)
+            paddle.seed(paddle_seed)
+            random.seed(stdlib_seed)
+            return
         global_rank = rank if rank is not None else int(os.environ.get(FASTNLP_GLOBAL_RANK, 0))
         # TODO gpu
-        process_seed = paddle.fluid.core.default_cpu_generator().initial_seed()
+        # worker 通过 fork 继承主进程的生成器，主进程传入的 base_seed 与在 worker 内读取的结果
+        # 相同，但省去了在新进程中访问 fluid.core 的冷启动开销；
+        if base_seed is not None:
+            process_seed = base_seed
+        else:
+            process_seed = paddle.fluid.core.default_cpu_generator().initial_seed()
         # back out the base seed so we can use all the bits
         base_seed = process_seed - worker_id
         ss = np.random.SeedSequence([base_seed, worker_id, global_rank])
@@ -429,10 +661,20 @@ class PaddleDriver(Driver):
 
     def set_deterministic_dataloader(self, dataloader):
         """
-        为了确定性训练要对 ``dataloader`` 进行修改，保证在确定随机数种子后，每次重新训练得到的结果是一样的。 
+        为了确定性训练要对 ``dataloader`` 进行修改，保证在确定随机数种子后，每次重新训练得到的结果是一样的。
         """
         if dataloader.worker_init_fn is None:
-            dataloader.worker_init_fn = partial(self.worker_init_function, rank=self.global_rank)
+            seed_table = None
+            # base_seed 在主进程中读取一次并随 partial 传入 worker，fork 出的 worker 无需再
+            # 访问 fluid.core 读取自己的种子；
+            base_seed = paddle.fluid.core.default_cpu_generator().initial_seed()
+            num_workers = getattr(dataloader, "num_workers", 0)
+            if num_workers:
+                # worker 通过 fork 继承主进程的随机数生成器，据此在主进程中预先推导出每个
+                # worker 的种子，省去每个 worker 启动时的 SeedSequence 计算；
+                seed_table = self._compute_worker_seeds(base_seed, num_workers, self.global_rank)
+            dataloader.worker_init_fn = partial(self.worker_init_function, rank=self.global_rank,
+                                                seed_table=seed_table, base_seed=base_seed)
 
     def set_sampler_epoch(self, dataloader: "DataLoader", cur_epoch_idx):
         r"""
@@ -441,27 +683,41 @@ class PaddleDriver(Driver):
         :param dataloader: 需要设置 ``epoch`` 的 ``dataloader``
         :param cur_epoch_idx: 当前是第几个 ``epoch``
         """
-        if callable(getattr(dataloader.batch_sampler, "set_epoch", None)):
-            dataloader.batch_sampler.set_epoch(cur_epoch_idx)
-        elif callable(getattr(dataloader.batch_sampler.sampler, "set_epoch", None)):
-            dataloader.batch_sampler.sampler.set_epoch(cur_epoch_idx)
+        # sampler 在训练过程中不会被替换（替换 sampler 时 fastNLP 会重建 dataloader），
+        # 因此首次探测到的 set_epoch 绑定方法可以按 dataloader 缓存，之后每个 epoch 只有一次查表；
+        try:
+            set_epoch = _set_epoch_cache[dataloader]
+        except (KeyError, TypeError):
+            set_epoch = getattr(dataloader.batch_sampler, "set_epoch", None)
+            if not callable(set_epoch):
+                set_epoch = getattr(dataloader.batch_sampler.sampler, "set_epoch", None)
+                if not callable(set_epoch):
+                    set_epoch = None
+            try:
+                _set_epoch_cache[dataloader] = set_epoch
+            except TypeError:
+                # 自定义的 dataloader 可能不支持弱引用，此时退化为每次探测；
+                pass
+        if set_epoch is not None:
+            set_epoch(cur_epoch_idx)
 
     @staticmethod
     def get_dataloader_args(dataloader: "DataLoader"):
         """
-        从 ``dataloader`` 中获取参数 ``dataset``, ``batch_sampler``, ``sampler``, ``batch_size``, ``shuffle`` 
-        和 ``drop_last`` 。
+        从 ``dataloader`` 中获取参数 ``dataset``, ``batch_sampler``, ``sampler``, ``batch_size``, ``shuffle``
+        和 ``drop_last`` 。同一个 ``dataloader`` 的解析结果会被缓存；当其 ``batch_sampler`` 没有
+        ``batch_size`` 属性时，这里需要真正取出一个 batch 来探测 batch_size，开销很大，缓存保证
+        这一代价最多只付一次。
         """
-        @dataclass
-        class Res:
-            dataset: Optional[Dataset] = None
-            batch_sampler: Optional[BatchSampler] = None
-            sampler: Optional[Sampler] = None
-            batch_size: Optional[int] = None
-            shuffle: Optional[bool] = None
-            drop_last: Optional[bool] = None
+        try:
+            return _dataloader_args_cache[dataloader]
+        except KeyError:
+            cacheable = True
+        except TypeError:
+            # 定制的 DataLoader 可能不支持弱引用
+            cacheable = False
 
-        res = Res()
+        res = _DataLoaderArgs()
 
         # paddle 的 DataLoader 一定会有 dataset 属性；
         res.dataset = dataloader.dataset
@@ -505,4 +761,6 @@ class PaddleDriver(Driver):
             else:
                 res.drop_last = False
 
+        if cacheable:
+            _dataloader_args_cache[dataloader] = res
         return res
@@ -1,6 +1,6 @@
 import os
 import contextlib
-from typing import Optional, Dict, Union, Callable, Tuple
+from typing import Any, Optional, Dict, Union, Callable, Tuple
 
 from .paddle_driver import PaddleDriver
 from .utils import replace_batch_sampler, replace_sampler
@@ -11,7 +11,7 @@ from fastNLP.core.utils import (
     get_paddle_gpu_str,
     get_paddle_device_id,
 )
-from fastNLP.core.utils.paddle_utils import _convert_data_device
+from fastNLP.core.utils.paddle_utils import _convert_data_device, paddle_to, paddle_move_data_to_device
 from fastNLP.core.utils.utils import _get_fun_msg
 from fastNLP.core.samplers import (
     ReproducibleBatchSampler,
@@ -78,15 +78,23 @@ class PaddleSingleDriver(PaddleDriver):
         self.global_rank = 0
         self.world_size = 1
 
+        # _convert_data_device 需要解析设备字符串并读取环境变量，而设备在训练过程中
+        # 不会改变，因此首次解析后缓存，避免每个 batch 重复解析；
+        self._resolved_data_device = None
+
     def setup(self):
         r"""
         初始化训练环境；设置当前训练的设备，并将模型迁移到对应设备上。
         """
-        device = _convert_data_device(self.data_device)
+        if self._resolved_data_device is None:
+            self._resolved_data_device = _convert_data_device(self.data_device)
+        device = self._resolved_data_device
 
         paddle.device.set_device(device)
         with contextlib.redirect_stdout(None):
             self.model.to(device)
+        # fp16 时预热 scaler 和 auto_cast，使首个 step 不必承担它们的一次性初始化开销；
+        self._warmup_fp16()
 
     def model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
         if isinstance(batch, Dict) and not self.wo_auto_param_call:
@@ -130,20 +138,12 @@ class PaddleSingleDriver(PaddleDriver):
 
         if reproducible:
             if type(args.batch_sampler) is PaddleBatchSampler:
-                if type(args.sampler) is PaddleRandomSampler:
-                    if isinstance(args.sampler, PaddleRandomSampler):
-                        if getattr(args.sampler, '_num_samples', None) is None \
-                                and getattr(args.sampler, 'replacements', False) is False \
-                                and getattr(args.sampler, 'generator', None) is None:
-                            # 如果本来就是随机的，并且没有定制，直接替换掉。
-                            sampler = RandomSampler(args.sampler.data_source, shuffle=True)
-                            logger.debug("Replace paddle RandomSampler into fastNLP RandomSampler.")
-                            return replace_sampler(dataloader, sampler)
-                elif type(args.sampler) is PaddleSequenialSampler:
-                    # 需要替换为不要 shuffle 的。
-                    sampler = RandomSampler(args.sampler.data_source, shuffle=False)
-                    logger.debug("Replace paddle SequentialSampler into fastNLP RandomSampler.")
-                    return replace_sampler(dataloader, sampler)
+                # 根据 sampler 的具体类型 O(1) 派发到对应的替换逻辑；
+                handler = _SAMPLER_REPLACEMENTS.get(type(args.sampler))
+                if handler is not None:
+                    res = handler(dataloader, args)
+                    if res is not None:
+                        return res
             batch_sampler = ReproduceBatchSampler(
                 batch_sampler=args.batch_sampler,
                 batch_size=args.batch_size,
@@ -153,6 +153,31 @@ class PaddleSingleDriver(PaddleDriver):
         else:
             return dataloader
 
+    def move_data_to_device(self, batch: Any) -> Any:
+        r"""
+        将数据集合 ``batch`` 迁移到指定的机器上。
+
+        相比基类的实现，这里为单个 :class:`paddle.Tensor` 以及元素全部为张量的浅层
+        ``dict`` / ``list`` / ``tuple`` 增加了快速路径，避免每个 batch 都走一遍
+        :func:`apply_to_collection` 的递归。
+
+        :param batch: 包含 :class:`paddle.Tensor` 的数据集合，可以是 **List**、**Dict** 等嵌套类型。
+        :return: 移动到指定机器后的 ``batch``。
+        """
+        if self._resolved_data_device is None:
+            self._resolved_data_device = _convert_data_device(self.data_device)
+        device = self._resolved_data_device
+        # 拷贝异步发起（blocking=False），同一计算流上随后的算子会等待拷贝完成，
+        # 正确性不受影响，但主机线程不必停下来等待传输；
+        if isinstance(batch, paddle.Tensor):
+            return paddle_to(batch, device, blocking=False)
+        # 只对原生的浅层容器启用快速路径，子类可能携带额外信息，仍交给 apply_to_collection 处理；
+        if type(batch) is dict and all(isinstance(v, paddle.Tensor) for v in batch.values()):
+            return {k: paddle_to(v, device, blocking=False) for k, v in batch.items()}
+        if type(batch) in (list, tuple) and all(isinstance(v, paddle.Tensor) for v in batch):
+            return type(batch)(paddle_to(v, device, blocking=False) for v in batch)
+        return paddle_move_data_to_device(batch, device, blocking=False)
+
     def unwrap_model(self):
         """
         :return: 训练使用的模型。
@@ -171,3 +196,38 @@ class PaddleSingleDriver(PaddleDriver):
         :return 是否为分布式的 **Driver** ，在 ``PaddleSingleDriver`` 中，返回 ``False``。
         """
         return False
+
+
+def _replace_paddle_random_sampler(dataloader, args):
+    """
+    :meth:`PaddleSingleDriver.set_dist_repro_dataloader` 中 sampler 为 paddle ``RandomSampler``
+    时的替换逻辑；返回 ``None`` 表示 sampler 被定制过，继续走 ``ReproduceBatchSampler`` 的包装逻辑。
+    """
+    if getattr(args.sampler, '_num_samples', None) is None \
+            and getattr(args.sampler, 'replacements', False) is False \
+            and getattr(args.sampler, 'generator', None) is None:
+        # 如果本来就是随机的，并且没有定制，直接替换掉。
+        sampler = RandomSampler(args.sampler.data_source, shuffle=True)
+        logger.debug("Replace paddle RandomSampler into fastNLP RandomSampler.")
+        return replace_sampler(dataloader, sampler)
+    return None
+
+def _replace_paddle_sequential_sampler(dataloader, args):
+    """
+    :meth:`PaddleSingleDriver.set_dist_repro_dataloader` 中 sampler 为 paddle ``SequenceSampler``
+    时的替换逻辑。
+    """
+    # 需要替换为不要 shuffle 的。
+    sampler = RandomSampler(args.sampler.data_source, shuffle=False)
+    logger.debug("Replace paddle SequentialSampler into fastNLP RandomSampler.")
+    return replace_sampler(dataloader, sampler)
+
+# sampler 具体类型到替换逻辑的派发表；key 只包含 paddle 原生类型，定制的子类不在其中，
+# 会自然落入 ReproduceBatchSampler 的包装逻辑；
+if _NEED_IMPORT_PADDLE:
+    _SAMPLER_REPLACEMENTS = {
+        PaddleRandomSampler: _replace_paddle_random_sampler,
+        PaddleSequenialSampler: _replace_paddle_sequential_sampler,
+    }
+else:
+    _SAMPLER_REPLACEMENTS = {}
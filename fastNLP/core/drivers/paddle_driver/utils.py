@@ -3,6 +3,8 @@ import os
 import struct
 import random
 import inspect
+import json
+import mmap
 import numpy as np
 from copy import deepcopy
 from contextlib import ExitStack, closing
@@ -265,6 +267,59 @@ def optimizer_state_to_device(state, device):
             new_state[name] = param
     return new_state
 
+def _save_tensor_dict_mmap(filepath: str, state_dict: Dict):
+    r"""
+    以 "JSON 头 + 原始张量字节" 的扁平格式保存一个 ``state_dict``，不经过 pickle。
+
+    文件布局为：8 字节小端的头部长度、JSON 头（记录每个张量的 dtype/shape/offset/nbytes）、
+    按头部顺序紧密排列的原始数据。这样 :func:`_load_tensor_dict_mmap` 可以直接 mmap 读取。
+
+    :param filepath: 保存文件的文件位置（需要包括文件名）；
+    :param state_dict: 名字到 :class:`paddle.Tensor` （或 numpy 数组）的扁平字典；
+    """
+    header = {}
+    buffers = []
+    offset = 0
+    for name, tensor in state_dict.items():
+        # tobytes 总是按 C 序导出，因此这里无需保证数组本身连续；
+        arr = tensor.numpy() if isinstance(tensor, paddle.Tensor) else np.asarray(tensor)
+        data = arr.tobytes()
+        header[name] = {"dtype": str(arr.dtype), "shape": list(arr.shape),
+                        "offset": offset, "nbytes": len(data)}
+        buffers.append(data)
+        offset += len(data)
+    header_bytes = json.dumps(header).encode("utf-8")
+    with open(filepath, "wb") as f:
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for data in buffers:
+            f.write(data)
+
+def _load_tensor_dict_mmap(filepath: str) -> Dict:
+    r"""
+    读取 :func:`_save_tensor_dict_mmap` 保存的文件，返回名字到 numpy 数组的字典。
+
+    数据通过 :func:`mmap.mmap` 以零拷贝的方式映射，数组直接引用页缓存中的数据，
+    多个进程读取同一文件时可以共享物理内存；``Layer.load_dict`` 可以直接接受 numpy 数组。
+
+    :param filepath: 保存文件的文件位置（需要包括文件名）；
+    :return: 名字到 numpy 数组的字典；
+    """
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header_size = int.from_bytes(mm[:8], "little")
+    header = json.loads(mm[8:8 + header_size].decode("utf-8"))
+    base = 8 + header_size
+    state_dict = {}
+    for name, meta in header.items():
+        count = 1
+        for s in meta["shape"]:
+            count *= s
+        arr = np.frombuffer(mm, dtype=meta["dtype"], count=count,
+                            offset=base + meta["offset"]).reshape(meta["shape"])
+        state_dict[name] = arr
+    return state_dict
+
 def _check_dataloader_args_for_distributed(args, controller='Trainer'):
     """
     检查 dataloader 的 sampler 情况，如果用户替换了自己定制的 sampler ，为了防止
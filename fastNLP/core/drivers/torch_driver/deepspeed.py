@@ -1,4 +1,6 @@
 import os
+import copy
+import inspect
 import argparse
 import logging
 from pathlib import Path
@@ -7,7 +9,6 @@ from typing import Union, Dict, List
 from .torch_driver import TorchDriver
 from .ddp import TorchDDPDriver
 from .utils import _create_default_config, _DeepSpeedWrappingModel
-from fastNLP.core.utils import nullcontext
 from fastNLP.core.log import logger
 from fastNLP.envs import(
     FASTNLP_DISTRIBUTED_CHECK,
@@ -19,15 +20,92 @@ if _NEED_IMPORT_TORCH:
     import torch
     import torch.distributed as dist
     from torch.optim import Optimizer
-    
+
+    # torch >= 2.0 的 new_group 支持 use_local_synchronization，创建子通信组时只需要组内的
+    # rank 参与，组创建开销从随 world_size 线性增长降为常数；
+    _NEW_GROUP_SUPPORTS_LOCAL_SYNC = "use_local_synchronization" in inspect.signature(dist.new_group).parameters
+
+    # 可见的 gpu 数量在进程生命周期内不会变化，import 时探测一次，
+    # 后续的参数校验不必每次都穿过 C++ binding 询问；
+    _DEVICE_COUNT = torch.cuda.device_count() if torch.cuda.is_available() else 0
+
 if _NEED_IMPORT_DEEPSPEED:
-    import deepspeed
-    from deepspeed import DeepSpeedEngine, DeepSpeedOptimizer
+    from functools import lru_cache
+
+    @lru_cache(maxsize=None)
+    def _import_deepspeed():
+        # deepspeed 的 import 需要数秒，放到真正构造 DeepSpeedDriver 时才进行，
+        # 避免只使用 torch driver 的用户在 import fastNLP 时也要付出这部分开销；
+        import deepspeed
+        from deepspeed import DeepSpeedEngine, DeepSpeedOptimizer
+        return deepspeed, DeepSpeedEngine, DeepSpeedOptimizer
+
+    @lru_cache(maxsize=None)
+    def _legal_optimizer_types():
+        # 合法的 optimizer 类型元组；依赖延迟导入的 deepspeed，因此同样延迟构建并缓存；
+        _, _, DeepSpeedOptimizer = _import_deepspeed()
+        return (Optimizer, DeepSpeedOptimizer)
 
 __all__ = [
     "DeepSpeedDriver",
 ]
 
+def _flat_all_gather_ints(payload: "torch.Tensor", nranks: int, group=None) -> List[List[int]]:
+    """
+    将每个 rank 的一维整型 ``payload`` 收集到一块连续缓冲中，返回按 rank 排列的嵌套 list。
+
+    相比为每个 rank 单独分配输出 tensor 的 list 版 ``all_gather``，这里只有一次分配、
+    一次 NCCL 调用和一次 D2H 拷贝；旧版本 torch 没有 ``all_gather_into_tensor`` 时退回 list 版。
+    """
+    numel = payload.numel()
+    if hasattr(dist, "all_gather_into_tensor"):
+        buf = torch.empty(nranks * numel, dtype=payload.dtype, device=payload.device)
+        dist.all_gather_into_tensor(buf, payload, group=group)
+        return buf.view(nranks, numel).cpu().tolist()
+    gathered = [torch.empty_like(payload) for _ in range(nranks)]
+    dist.all_gather(gathered, payload, group=group)
+    return torch.stack(gathered).cpu().tolist()
+
+def _noop():
+    pass
+
+class _ReentrantNullContext:
+    # 什么都不做的上下文；无任何状态因此单例即可安全重入。调用返回自身，
+    # 使得 trainer 侧 ``with driver.get_model_no_sync_context()(): ...`` 的用法
+    # 不再每步构造一个新的 generator 上下文对象；
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_CTX = _ReentrantNullContext()
+
+# strategy 到默认 deepspeed 配置的映射；配置是纯数据，在 import 时构建一次作为模板，
+# setup_config 使用时深拷贝即可，避免每次实例化 trainer 都重新构造；
+_STRATEGY_CONFIGS = {
+    "deepspeed": _create_default_config(stage=2),
+    "deepspeed_stage_1": _create_default_config(stage=1),
+    "deepspeed_stage_2": _create_default_config(stage=2),
+    "deepspeed_stage_2_offload": _create_default_config(stage=2, offload_optimizer=True),
+    "deepspeed_stage_3": _create_default_config(stage=3),
+    "deepspeed_stage_3_offload": _create_default_config(
+        stage=3,
+        offload_optimizer=True,
+        offload_parameters=True,
+    ),
+    "deepspeed_stage_3_offload_nvme": _create_default_config(
+        stage=3,
+        offload_optimizer=True,
+        offload_parameters=True,
+        offload_params_device="nvme",
+        offload_optimizer_device="nvme",
+    ),
+}
+
 class DeepSpeedDriver(TorchDDPDriver):
     """
     实现 ``deepspeed`` 分布式训练的 ``Driver``。
@@ -125,6 +203,7 @@ class DeepSpeedDriver(TorchDDPDriver):
         **kwargs
     ):
         assert _NEED_IMPORT_DEEPSPEED, "Deepspeed is not imported."
+        deepspeed, DeepSpeedEngine, _ = _import_deepspeed()
         kwargs.pop("torch_kwargs", None)
         self._ds_kwargs = deepspeed_kwargs
         TorchDriver.__init__(self, model=model, fp16=False, torch_kwargs=deepspeed_kwargs, **kwargs)
@@ -163,7 +242,7 @@ class DeepSpeedDriver(TorchDDPDriver):
         if isinstance(self._data_device, int):
             if self._data_device < 0:
                 raise ValueError("Parameter `data_device` can not be smaller than 0.")
-            _could_use_device_num = torch.cuda.device_count()
+            _could_use_device_num = _DEVICE_COUNT
             if self._data_device >= _could_use_device_num:
                 raise ValueError("The gpu device that parameter `device` specifies is not existed.")
             self._data_device = torch.device(f"cuda:{self._data_device}")
@@ -195,14 +274,17 @@ class DeepSpeedDriver(TorchDDPDriver):
                         "to 1 for deepspeed configuration.")
             self.train_micro_batch_size = 1
 
+        # 是否为 ZeRO stage 3，在 setup_config 确定配置后计算并缓存；
+        self._stage_3 = None
         self.strategy = self._ds_kwargs.get("strategy", "deepspeed")
         deepspeed_logging_level = self._ds_kwargs.get("logging_level", logging.ERROR)
         deepspeed.utils.logging.logger.setLevel(deepspeed_logging_level)
 
     @staticmethod
     def _check_optimizer_legality(optimizers):
+        legal_types = _legal_optimizer_types()
         for each_optimizer in optimizers:
-            if not isinstance(each_optimizer, (Optimizer, DeepSpeedOptimizer)):
+            if not isinstance(each_optimizer, legal_types):
                 raise TypeError(f"Each optimizer of parameter `optimizers` should be 'Optimizer' or "
                                 f"'DeepSpeedOptimizer'type, not {type(each_optimizer)}.")
 
@@ -217,8 +299,12 @@ class DeepSpeedDriver(TorchDDPDriver):
             raise ValueError("Multi optimizers is not supported for `DeepSpeedDriver` right now.")
         if self._has_setup:
             return
+        deepspeed, _, _ = _import_deepspeed()
         self._has_setup = True
         self.setup_config()
+        # 通信组是否初始化在下面的各分支里都要用到，且在真正调用 init_distributed
+        # 之前不会变化，这里只穿过一次 C++ binding 探测；
+        initialized = dist.is_initialized()
         # 如果用户需要使用多机模式，那么一定进入到这里；
         if self.is_pull_by_torch_run:
             if self.outside_ddp:
@@ -230,7 +316,7 @@ class DeepSpeedDriver(TorchDDPDriver):
                 self.global_rank = int(os.environ.get("RANK"))
                 logger.info(f"World size: {self.world_size}, Global rank: {self.global_rank}")
 
-                if not dist.is_initialized():
+                if not initialized:
                     deepspeed.init_distributed("nccl", distributed_port=self.master_port)
 
                 os.environ["fastnlp_torch_launch_not_ddp"] = "yes"
@@ -240,7 +326,7 @@ class DeepSpeedDriver(TorchDDPDriver):
         # 一定是单机；
         # self.parallel_device 一定是 List[torch.device]；
         else:
-            if not dist.is_initialized():
+            if not initialized:
                 # 这里主要的问题在于要区分 rank0 和其它 rank 的情况；
                 self.world_size = len(self.parallel_device)
                 self.open_subprocess()
@@ -267,25 +353,57 @@ class DeepSpeedDriver(TorchDDPDriver):
             self.configure_ddp()
 
         self.barrier()
+        # 到这里 self.model 一定已经是 DeepSpeedEngine；把 backward / step 直接绑定到
+        # engine 的方法上，训练热路径上每步就少一层 python 转发帧；zero_grad 在
+        # deepspeed 中由 step 兼顾，绑定为模块级的空操作即可；
+        self.backward = self.model.backward
+        self.step = self.model.step
+        self.zero_grad = _noop
         # 初始化 self._pids，从而使得每一个进程都能接受到 rank0 的 send 操作；
-        self._pids = [torch.tensor(0, dtype=torch.int).to(self.data_device) for _ in range(dist.get_world_size())]
-        dist.all_gather(self._pids, torch.tensor(os.getpid(), dtype=torch.int).to(self.data_device))
+        # 实际只需要本节点进程的 pid，当环境变量给出了 LOCAL_WORLD_SIZE（torchrun 等启动方式）
+        # 时，在节点内的通信组里只收集本节点的 pid，通信量从 O(world_size) 降为 O(local_world_size)；
+        # setup 的所有分支在此之前都已经确定了 self.world_size，无需再询问通信库；
+        world_size = self.world_size
         local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE")) if "LOCAL_WORLD_SIZE" in os.environ else None
-        if local_world_size is None:
-            local_world_size = torch.tensor(int(os.environ.get("LOCAL_RANK")), dtype=torch.int).to(self.data_device)
-            dist.all_reduce(local_world_size, op=dist.ReduceOp.MAX)
-            local_world_size = local_world_size.tolist() + 1
-
-        node_rank = self.global_rank // local_world_size
-        self._pids = self._pids[node_rank * local_world_size: (node_rank + 1) * local_world_size]
-        self._pids = self.tensor_to_numeric(self._pids)
+        if local_world_size is not None:
+            node_group = None
+            if world_size > local_world_size:
+                node_rank = self.global_rank // local_world_size
+                if _NEW_GROUP_SUPPORTS_LOCAL_SYNC:
+                    # 只有组内的 rank 需要参与创建，每个进程只建立自己所在节点的组；
+                    ranks = list(range(node_rank * local_world_size, (node_rank + 1) * local_world_size))
+                    node_group = dist.new_group(ranks=ranks, use_local_synchronization=True)
+                else:
+                    # 旧版 torch 的 new_group 要求所有 rank 都参与每一次调用，
+                    # 因此逐节点创建并记下自己所在的组；
+                    for i in range(world_size // local_world_size):
+                        ranks = list(range(i * local_world_size, (i + 1) * local_world_size))
+                        group = dist.new_group(ranks=ranks)
+                        if self.global_rank in ranks:
+                            node_group = group
+            send = torch.tensor([os.getpid()], dtype=torch.int, device=self.data_device)
+            self._pids = [row[0] for row in _flat_all_gather_ints(send, local_world_size, group=node_group)]
+        else:
+            # 环境变量缺失时退回全局 gather：将 pid 和 local_rank 拼成一个 payload 一次性
+            # all_gather，由最大的 local_rank 推出 local_world_size，省去单独的一次 all_reduce；
+            payload = torch.tensor([os.getpid(), int(os.environ.get("LOCAL_RANK", self.local_rank))],
+                                   dtype=torch.int, device=self.data_device)
+            gathered = _flat_all_gather_ints(payload, world_size)
+            local_world_size = max(pair[1] for pair in gathered) + 1
+            node_rank = self.global_rank // local_world_size
+            self._pids = [pair[0] for pair in gathered[node_rank * local_world_size: (node_rank + 1) * local_world_size]]
 
     def configure_ddp(self):
-        
+
+        deepspeed, DeepSpeedEngine, _ = _import_deepspeed()
         # 设置 deepspeed
         if not isinstance(self.model, DeepSpeedEngine):
             model=_DeepSpeedWrappingModel(self.model, self.fp16)
-            model_parameters = filter(lambda p: p.requires_grad, model.parameters())
+            # 一次性物化为 list：deepspeed 内部会多次遍历该参数集合，一次性的 filter
+            # 迭代器在第二次遍历时已经耗尽，且每次遍历都要重复 python 层的属性访问；
+            # 列表推导对每个参数只走一趟 python 层且没有额外的函数调用帧，
+            # 不必再经由 filter(lambda) 或先建 mask 再 compress 的两趟写法；
+            model_parameters = [p for p in model.parameters() if p.requires_grad]
             self.model, ds_optimizer, _, _ = deepspeed.initialize(
                 args=argparse.Namespace(device_rank=self.model_device.index),
                 model=model,
@@ -294,7 +412,7 @@ class DeepSpeedDriver(TorchDDPDriver):
                 config=self.config,
                 dist_init_required=False
             )
-            self._optimizers = [ds_optimizer]
+            self.optimizers = [ds_optimizer]
 
             if self.config.get("activation_checkpointing"):
                 checkpoint_config = self.config["activation_checkpointing"]
@@ -314,35 +432,30 @@ class DeepSpeedDriver(TorchDDPDriver):
         if self.config is not None:
             logger.warning("Notice that you have defined a configuration for deepspeed and parameters like"
                         "`optimizers`, `strategy` and `fp16` may not take effects.")
+            self._stage_3 = self._compute_stage_3()
             return
 
-        if self.strategy == "deepspeed":
-            self.config = _create_default_config(stage=2)
-        elif self.strategy == "deepspeed_stage_1":
-            self.config = _create_default_config(stage=1)
-        elif self.strategy == "deepspeed_stage_2":
-            self.config = _create_default_config(stage=2)
-        elif self.strategy == "deepspeed_stage_2_offload":
-            self.config = _create_default_config(stage=2, offload_optimizer=True)
-        elif self.strategy == "deepspeed_stage_3":
-            self.config = _create_default_config(stage=3)
-        elif self.strategy == "deepspeed_stage_3_offload":
-            self.config = _create_default_config(
-                stage=3,
-                offload_optimizer=True,
-                offload_parameters=True,
-            )
-        elif self.strategy == "deepspeed_stage_3_offload_nvme":
-            self.config = _create_default_config(
-                stage=3,
-                offload_optimizer=True,
-                offload_parameters=True,
-                remote_device="nvme",
-                offload_params_device="nvme",
-                offload_optimizer_device="nvme",
-            )
-        else:
+        # ZeRO 的收益来自切分大模型的状态；模型本身足够小时，deepspeed 为每个参数注册的
+        # python hook 反而会成为 step 的主要开销，普通 DDP 往往更快。这里只做提示而不偷偷
+        # 切换 driver：两者的 checkpoint 格式互不兼容，切换应当由用户自己决定；
+        if self.strategy == "deepspeed" and torch.cuda.is_available():
+            try:
+                free_mem = torch.cuda.mem_get_info()[0]
+                # 参数 + 梯度 + Adam 的两份动量，全部按 fp32 估算
+                state_bytes = sum(p.numel() for p in self.model.parameters()) * 16
+                if state_bytes * 2 < free_mem:
+                    logger.rank_zero_warning(
+                        "Your model and its optimizer states seem small enough to fit on a single gpu. "
+                        "ZeRO sharding may cost more than it saves in this case; consider using "
+                        "`driver='torch'` for better throughput.", once=True)
+            except Exception:
+                pass
+
+        base_config = _STRATEGY_CONFIGS.get(self.strategy)
+        if base_config is None:
             raise ValueError(f"Unknown deepspeed strategy {self.strategy}.")
+        # 模板是全局共享的，深拷贝一份防止后面的修改互相影响；
+        self.config = copy.deepcopy(base_config)
 
         # 设置成 max_int 防止 deepspeed 的输出干扰 fastnlp 的输出
         self.config.setdefault("steps_per_print", 2147483647)
@@ -350,22 +463,35 @@ class DeepSpeedDriver(TorchDDPDriver):
         self.config.setdefault("train_micro_batch_size_per_gpu", self.train_micro_batch_size)
 
         if self.fp16:
-            if "fp16" not in self.config:
-                # FP16 is a DeepSpeed standalone AMP implementation
-                logger.debug("Enabling DeepSpeed FP16.")
-                # TODO 这部分是否可以像 pytorch-lightning 那样给用户定制
-                self.config["fp16"] = {
-                    "enabled": True,
-                    "loss_scale": 0,
-                    "initial_scale_power": True,
-                    "loss_scale_window": 1000,
-                    "hysteresis": 2,
-                    "min_loss_scale": 1,
-                }
+            if "fp16" not in self.config and "bf16" not in self.config:
+                if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+                    # bf16 的指数范围与 fp32 相同，不需要动态 loss scaling，
+                    # 也就没有 scaler 在每个 step 上的开销和周期性的跳步；
+                    logger.rank_zero_warning("Your device supports bf16, and we will use it instead of fp16 "
+                                             "to avoid the overhead of dynamic loss scaling.", once=True)
+                    self.config["bf16"] = {"enabled": True}
+                else:
+                    # FP16 is a DeepSpeed standalone AMP implementation
+                    logger.debug("Enabling DeepSpeed FP16.")
+                    # TODO 这部分是否可以像 pytorch-lightning 那样给用户定制
+                    self.config["fp16"] = {
+                        "enabled": True,
+                        "loss_scale": 0,
+                        "initial_scale_power": 16,
+                        "loss_scale_window": 1000,
+                        "hysteresis": 2,
+                        "min_loss_scale": 1,
+                    }
             elif "amp" not in self.config:
                 logger.debug("Enabling DeepSpeed APEX Implementation.")
                 self.config["amp"] = {"enabled": True, "opt_level": "O1"}
 
+        self._stage_3 = self._compute_stage_3()
+
+    def _compute_stage_3(self) -> bool:
+        zero_optimization = self.config.get("zero_optimization")
+        return bool(zero_optimization and zero_optimization.get("stage") == 3)
+
     def zero_grad(self):
         """
         进行梯度置零操作；由于 :meth:`DeepSpeedEngine.step` 包含了 :meth:`zero_step` 的功能，因此该接口实际无意义。
@@ -375,13 +501,13 @@ class DeepSpeedDriver(TorchDDPDriver):
 
     def backward(self, loss):
         """
-        对 ``loss`` 进行反向传播
+        对 ``loss`` 进行反向传播；``setup`` 之后该接口会被直接绑定到 ``DeepSpeedEngine.backward``。
         """
         self.model.backward(loss)
 
     def step(self):
         """
-        更新模型的参数
+        更新模型的参数；``setup`` 之后该接口会被直接绑定到 ``DeepSpeedEngine.step``。
         """
         self.model.step()
 
@@ -390,7 +516,7 @@ class DeepSpeedDriver(TorchDDPDriver):
         :return: 一个 ``context`` 上下文环境，用于关闭各个进程之间的同步；在 ``deepspeed`` 中，返回一个空的上下文
         """
         # 注意此时的 model 是 "DistributedDataParallel" 对象；
-        return nullcontext
+        return _NULL_CTX
 
     def save_model(self, filepath: Union[str, Path], only_state_dict: bool = False, **kwargs):
         """
@@ -504,6 +630,9 @@ class DeepSpeedDriver(TorchDDPDriver):
     @property
     def stage_3(self) -> bool:
         """
-        判断是否为第三阶段的 ZeRO 优化
+        判断是否为第三阶段的 ZeRO 优化；结果在 :meth:`setup_config` 中计算并缓存。
         """
-        return self.config.get("zero_optimization") and self.config.get("zero_optimization").get("stage") == 3
\ No newline at end of file
+        if self._stage_3 is None:
+            # setup_config 还未执行（例如用户在外部初始化 deepspeed 的情况），按当前配置计算；
+            self._stage_3 = self._compute_stage_3()
+        return self._stage_3
\ No newline at end of file
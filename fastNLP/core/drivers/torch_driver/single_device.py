@@ -39,6 +39,8 @@ class TorchSingleDriver(TorchDriver):
         * *set_grad_to_none* -- 是否在训练过程中在每一次 optimizer 更新后将 grad 置为 ``None``
         * *non_blocking* -- 表示用于 :meth:`torch.Tensor.to` 方法的参数 non_blocking
         * *gradscaler_kwargs* -- 用于 ``fp16=True`` 时，提供给 :class:`torch.amp.cuda.GradScaler` 的参数
+        * *overlap_step_with_backward* -- 是否将参数更新注册为逐参数的 hook 在 backward 过程中完成，
+          以释放完整梯度缓冲占用的显存；需要 ``torch>=2.1`` 且与 ``fp16=True`` 互斥
     :kwargs:
         * *wo_auto_param_call* (``bool``) -- 是否关闭在训练时调用我们的 ``auto_param_call`` 函数来自动匹配 batch 和前向函数的参数的行为
 
@@ -73,20 +75,48 @@ class TorchSingleDriver(TorchDriver):
         self.global_rank = 0
         self.world_size = 1
 
+        # wo_auto_param_call 在整个训练过程中不会变化，这里一次性绑定 model_call 的实现，
+        # 训练热路径上不必每个 batch 都读取该标志并判断分支；
+        self._model_call_impl = self._plain_model_call if self.wo_auto_param_call else self._auto_model_call
+        # fn 名称到 (call_fn, signature_fn) 的缓存；模型在构造之后不会被替换，
+        # 同一个 fn 的解析结果（以及解析过程中的提示日志）只需要产生一次；
+        self._resolved_model_call_fns = {}
+
     def setup(self):
         r"""
         将模型迁移到相应的设备上。
         """
         if self.model_device is not None:
-            self.model.to(self.model_device)
+            if self.model_device.type == "cuda" and \
+                    any(isinstance(m, torch.nn.Conv2d) for m in self.model.modules()):
+                # 以卷积为主的模型使用 channels_last 布局能让 cuDNN 选到更快的 kernel；
+                # non_blocking=True 让拷贝相对 host 异步发起，后续同一计算流上的算子仍按序执行；
+                self.model.to(self.model_device, memory_format=torch.channels_last, non_blocking=True)
+            else:
+                self.model.to(self.model_device, non_blocking=True)
 
     def model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
-        if isinstance(batch, Dict) and not self.wo_auto_param_call:
+        return self._model_call_impl(batch, fn, signature_fn)
+
+    def _auto_model_call(self, batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
+        if isinstance(batch, Dict):
             return auto_param_call(fn, batch, signature_fn=signature_fn)
         else:
             return fn(batch)
 
+    @staticmethod
+    def _plain_model_call(batch, fn: Callable, signature_fn: Optional[Callable]) -> Dict:
+        return fn(batch)
+
     def get_model_call_fn(self, fn: str) -> Tuple:
+        try:
+            return self._resolved_model_call_fns[fn]
+        except KeyError:
+            res = self._resolve_model_call_fn(fn)
+            self._resolved_model_call_fns[fn] = res
+            return res
+
+    def _resolve_model_call_fn(self, fn: str) -> Tuple:
         if isinstance(self.model, DataParallel):
             model = self.unwrap_model()
             if hasattr(model, fn):
@@ -124,6 +154,19 @@ class TorchSingleDriver(TorchDriver):
         elif isinstance(dist, ReproducibleSampler):
             return replace_sampler(dataloader, dist)
 
+        # 最常见的情况：dist 为 None 且不要求 reproducible，只要 dataloader 没有携带
+        # Reproducible 系列的 sampler，返回的就是原 dataloader 本身；这里用几次直接的属性
+        # 判断提前返回，省去 get_dataloader_args 的完整解析；包裹式的 batch_sampler
+        # （其自身还有 batch_sampler 属性）情况少见，仍交给下面的完整逻辑处理；
+        if dist is None and not reproducible:
+            batch_sampler = getattr(dataloader, "batch_sampler", None)
+            sampler = getattr(batch_sampler, "sampler", None) if batch_sampler is not None \
+                else getattr(dataloader, "sampler", None)
+            if not isinstance(batch_sampler, ReproducibleBatchSampler) \
+                    and not isinstance(sampler, ReproducibleSampler) \
+                    and not hasattr(batch_sampler, "batch_sampler"):
+                return dataloader
+
         # 如果 dist 为 str 或者 None，说明是在 trainer 初试化时调用；
         args = self.get_dataloader_args(dataloader)
         if isinstance(args.batch_sampler, ReproducibleBatchSampler):
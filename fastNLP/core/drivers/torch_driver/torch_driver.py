@@ -1,4 +1,5 @@
 import os
+import weakref
 from typing import Union, Dict, Optional, Callable
 from functools import partial
 import numpy as np
@@ -23,7 +24,6 @@ __all__ = [
     'TorchDriver'
 ]
 
-from .utils import optimizer_state_to_device
 from fastNLP.core.drivers.driver import Driver
 from fastNLP.core.drivers.torch_driver.utils import _build_fp16_env, DummyGradScaler
 from fastNLP.core.utils import apply_to_collection, torch_move_data_to_device
@@ -33,6 +33,110 @@ from fastNLP.core.log import logger
 from fastNLP.core.samplers import ReproducibleBatchSampler, ReproducibleSampler, ReproduceBatchSampler, RandomSampler
 from fastNLP.core.dataloaders import OverfitDataLoader
 
+@dataclass
+class _DataLoaderArgs:
+    """:meth:`TorchDriver.get_dataloader_args` 的解析结果。"""
+    dataset: Optional["Dataset"] = None
+    batch_sampler: Optional["BatchSampler"] = None
+    sampler: Optional["Sampler"] = None
+    batch_size: Optional[int] = None
+    shuffle: Optional[bool] = None
+    drop_last: Optional[bool] = None
+
+# get_dataloader_args 的结果缓存。fastNLP 替换 sampler 时总是重建一个新的 dataloader
+# 而不会原地修改旧的，因此按实例缓存是安全的；用弱引用保证不会延长 dataloader 的生命周期。
+_dataloader_args_cache = weakref.WeakKeyDictionary()
+
+# check_dataloader_legality 的判空结果缓存；fastNLP 替换 sampler 时总是重建新的 dataloader，
+# 因此判空结果对一个 dataloader 实例而言是不变的。
+_dataloader_empty_cache = weakref.WeakKeyDictionary()
+
+class _CUDAPrefetchDataLoader:
+    r"""
+    在独立 cuda stream 上预取下一个 batch 的 dataloader 包装。
+
+    迭代产出第 k 个 batch 之前，第 k+1 个 batch 的 H2D 拷贝已经在 prefetch stream 上发出，
+    主计算流只需等待一个 event 即可拿到数据，数据搬运得以与上一个 step 的计算重叠。
+    其余属性访问全部透传给原 dataloader。
+    """
+
+    def __init__(self, dataloader, device: "torch.device", non_blocking: bool = True):
+        self.dataloader = dataloader
+        self.device = device
+        self.non_blocking = non_blocking
+        self._stream = torch.cuda.Stream(device=device)
+
+    def __iter__(self):
+        iterator = iter(self.dataloader)
+        prefetched = self._prefetch(iterator)
+        while prefetched is not None:
+            batch, event = prefetched
+            # 先发起下一个 batch 的预取，再让主流等待当前 batch 的拷贝完成；
+            prefetched = self._prefetch(iterator)
+            consumer_stream = torch.cuda.current_stream(self.device)
+            consumer_stream.wait_event(event)
+
+            def _record(tensor, stream=consumer_stream):
+                # 这些块是在预取流上分配的；向分配器声明它们正被 consumer 流使用，
+                # 否则训练循环释放引用后，块可能立刻回到预取流的池子里，下一次预取
+                # 会覆写仍在被在途计算 kernel 读取的数据；
+                if tensor.is_cuda:
+                    tensor.record_stream(stream)
+                return tensor
+
+            batch = apply_to_collection(batch, dtype=torch.Tensor, function=_record)
+            yield batch
+
+    def _prefetch(self, iterator):
+        try:
+            batch = next(iterator)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(self._stream):
+            batch = torch_move_data_to_device(batch, self.device, non_blocking=True)
+        event = torch.cuda.Event()
+        event.record(self._stream)
+        return batch, event
+
+    def __len__(self):
+        return len(self.dataloader)
+
+    def __getattr__(self, name):
+        return getattr(self.dataloader, name)
+
+def _import_safetensors():
+    # safetensors 是可选依赖，只有显式传入 use_safetensors=True 时才需要；
+    try:
+        from safetensors.torch import save_file, load_file
+    except ImportError:
+        raise ModuleNotFoundError("Parameter `use_safetensors=True` requires the `safetensors` package, "
+                                  "please install it by `pip install safetensors`.")
+    return save_file, load_file
+
+# 后台写 checkpoint 的单线程执行器；按需创建，max_workers=1 保证写盘顺序与提交顺序一致；
+_ckpt_io_executor = None
+
+# 在途的后台写盘任务；与执行器一样模块级共享：同一进程内先后存在的多个 driver（例如保存后
+# 立刻重建 Trainer 恢复断点）都要先等它结束，否则可能读到只写了一半的文件；
+_pending_ckpt_future = None
+
+def _get_ckpt_io_executor():
+    global _ckpt_io_executor
+    if _ckpt_io_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _ckpt_io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fastnlp-ckpt-io")
+    return _ckpt_io_executor
+
+def _submit_ckpt_write(fn, *args):
+    global _pending_ckpt_future
+    _wait_ckpt_write()
+    _pending_ckpt_future = _get_ckpt_io_executor().submit(fn, *args)
+
+def _wait_ckpt_write():
+    global _pending_ckpt_future
+    if _pending_ckpt_future is not None:
+        _pending_ckpt_future.result()
+        _pending_ckpt_future = None
 
 class TorchDriver(Driver):
     r"""
@@ -61,7 +165,8 @@ class TorchDriver(Driver):
         self.fp16 = fp16
         self.auto_cast, _grad_scaler = _build_fp16_env(dummy=not self.fp16)
         self.grad_scaler = _grad_scaler(**self._torch_kwargs.get('gradscaler_kwargs', {}))
-        self.set_grad_to_none = self._torch_kwargs.get('set_grad_to_none')
+        # 默认将 grad 置为 None（与 pytorch 2.0 起 zero_grad 的默认行为一致），可以省下一次显存写入；
+        self.set_grad_to_none = self._torch_kwargs.get('set_grad_to_none', True)
 
         # 用来设置 `torch_move_data_to_device` 中的 `non_blocking` 参数；
         self.non_blocking = self._torch_kwargs.get("non_blocking", True)
@@ -69,26 +174,91 @@ class TorchDriver(Driver):
         # 用来设置是否关闭 auto_param_call 中的参数匹配问题；
         self.wo_auto_param_call = kwargs.get("model_wo_auto_param_call", False)
 
+        # 是否把 optimizer 的更新注册为逐参数的 hook，在 backward 过程中随梯度一起完成；
+        self.overlap_step_with_backward = self._torch_kwargs.get("overlap_step_with_backward", False)
+        self._accumulation_steps = kwargs.get("accumulation_steps", 1)
+        # 已注册的 post-accumulate-grad hook 的 handle，重复 set_optimizers 时用于先移除旧 hook；
+        self._overlap_hook_handles = []
+        # 参数在 state_dict 中的全局序号到逐参数 optimizer 的映射；overlap 模式下真正 step 的
+        # 是这些 optimizer，checkpoint 时据此合并 / 拆分它们的状态；
+        self._overlap_param_optimizers = {}
+
+        # save_model 使用的 pinned 内存镜像，首次保存时按 state_dict 的形状惰性分配并复用；
+        self._pinned_state_dict = None
+        # optimizer 状态的 pinned 内存镜像，按 optimizer 序号与 (参数, 状态名) 缓存；
+        self._opt_pinned_mirrors = {}
+
+    def set_optimizers(self, optimizers=None):
+        super().set_optimizers(optimizers)
+        if self.overlap_step_with_backward:
+            self._setup_overlap_step_with_backward()
+
+    def _setup_overlap_step_with_backward(self):
+        r"""
+        将参数更新注册为逐参数的 post-accumulate-grad hook：每个参数的梯度一经累积完毕就被
+        立刻消费并释放，不必等整个 backward 结束后再串行执行 step；梯度缓冲不再需要整份
+        存活，大模型上可以明显降低峰值显存，参数更新也与 backward 的剩余部分重叠进行。
+        """
+        if not hasattr(torch.Tensor, "register_post_accumulate_grad_hook"):
+            raise RuntimeError("Parameter `overlap_step_with_backward` requires torch>=2.1 which provides "
+                               "`torch.Tensor.register_post_accumulate_grad_hook`.")
+        if self.is_distributed():
+            raise RuntimeError("Parameter `overlap_step_with_backward` is not supported in distributed "
+                               "training, because gradients are still being synchronized during backward.")
+        if not isinstance(self.grad_scaler, DummyGradScaler):
+            raise RuntimeError("Parameter `overlap_step_with_backward` can not be used together with `fp16=True`, "
+                               "because `GradScaler` has to inspect all gradients before each optimizer step.")
+        if len(self.optimizers) != 1:
+            raise RuntimeError("Parameter `overlap_step_with_backward` only supports one single optimizer.")
+        if self._accumulation_steps != 1:
+            raise RuntimeError("Parameter `overlap_step_with_backward` can not be used together with "
+                               "`accumulation_steps > 1`: the hooks consume each gradient as soon as backward "
+                               "produces it, so every micro batch would trigger an optimizer step.")
+
+        # set_optimizers 可能在同一个 driver 上被再次调用，先移除旧 hook，避免同一参数被更新两次；
+        for handle in self._overlap_hook_handles:
+            handle.remove()
+        self._overlap_hook_handles = []
+        self._overlap_param_optimizers = {}
+
+        optimizer = self.optimizers[0]
+        # index 是参数在 optimizer.state_dict() 中的全局序号，所有 param_group 连续编号，
+        # requires_grad=False 的参数同样占号；
+        index = 0
+        for group in optimizer.param_groups:
+            hyper_params = {key: value for key, value in group.items() if key != "params"}
+            for param in group["params"]:
+                if not param.requires_grad:
+                    index += 1
+                    continue
+                # 每个参数配一个只管自己的 optimizer，hook 触发时原地完成更新并释放梯度；
+                param_optimizer = type(optimizer)([param], **hyper_params)
+                self._overlap_param_optimizers[index] = param_optimizer
+                handle = param.register_post_accumulate_grad_hook(partial(self._step_param, optimizer=param_optimizer))
+                self._overlap_hook_handles.append(handle)
+                index += 1
+        # 更新已经在 backward 过程中完成，step / zero_grad 不再需要做任何事情；
+        self.step = self._overlapped_noop
+        self.zero_grad = self._overlapped_noop
+
+    @staticmethod
+    def _step_param(param, optimizer):
+        optimizer.step()
+        optimizer.zero_grad(set_to_none=True)
+
+    @staticmethod
+    def _overlapped_noop():
+        pass
+
     def zero_grad(self):
         """
         实现梯度置零的过程
         """
+        # optimizer.zero_grad 在 C++ 层完成遍历：set_to_none=True 时只丢弃引用不触碰显存，
+        # set_to_none=False 时按 dtype 分组用 foreach kernel 一次置零，
+        # 都远快于从 python 逐参数地 detach / zero_；
         for optimizer in self.optimizers:
-            self._clear_grad(optimizer, self.set_grad_to_none)
-
-    def _clear_grad(self, optimizer, set_to_none):
-        param_groups = optimizer.param_groups
-        for group in param_groups:
-            for p in group['params']:
-                if p.grad is not None:
-                    if set_to_none:
-                        p.grad = None
-                    else:
-                        if p.grad.grad_fn is not None:
-                            p.grad.detach_()
-                        else:
-                            p.grad.requires_grad_(False)
-                        p.grad.zero_()
+            optimizer.zero_grad(set_to_none=self.set_grad_to_none)
 
     def backward(self, loss):
         """
@@ -112,7 +282,28 @@ class TorchDriver(Driver):
         """
         if not isinstance(dataloader, DataLoader) and not isinstance(dataloader, OverfitDataLoader):
             raise TypeError(f"{DataLoader} is expected, instead of `{type(dataloader)}`")
-        if len(dataloader) == 0:
+        # 该函数在每次 fit / evaluate 进入时都会被调用，而 len(dataloader) 依赖 sampler 的
+        # __len__，对自定义 sampler 可能是 O(N) 的；这里按 dataloader 实例缓存判空结果，
+        # 首次计算时优先用 O(1) 的数据集长度，只有 drop_last 可能丢弃全部样本时才计算 batch 数；
+        try:
+            is_empty = _dataloader_empty_cache[dataloader]
+        except (KeyError, TypeError):
+            try:
+                num_samples = len(dataloader.dataset)
+            except TypeError:
+                num_samples = None
+            if num_samples is None:
+                is_empty = len(dataloader) == 0
+            elif num_samples == 0:
+                is_empty = True
+            else:
+                is_empty = getattr(dataloader, "drop_last", False) and len(dataloader) == 0
+            try:
+                _dataloader_empty_cache[dataloader] = is_empty
+            except TypeError:
+                # 自定义的 dataloader 可能不支持弱引用；
+                pass
+        if is_empty:
             logger.rank_zero_warning("Your dataloader is empty, which is not recommended because it "
                                         "may cause some unexpected exceptions.", once=True)
 
@@ -136,12 +327,37 @@ class TorchDriver(Driver):
         if tensor is None:
             return None
 
+        reducer = _reduces[reduce] if reduce is not None else None
+
+        # 第一遍先收集 cuda 上会被转成单一数值的叶子（0 维张量或归约结果），按 (device, dtype)
+        # 分组 stack 后一次性搬回 cpu：每次 .item() 都要排空一次计算流，对包含大量张量的集合
+        # （如 per-class 的 metric 结果）这样整个集合只需要同步一次；
+        groups = {}
+        group_keys = []
+
+        def _collect(_data):
+            if _data.is_cuda and (_data.numel() == 1 or reducer is not None):
+                scalar = _data.reshape(()) if _data.numel() == 1 else reducer(_data)
+                key = (scalar.device, scalar.dtype)
+                groups.setdefault(key, []).append(scalar)
+                group_keys.append(key)
+            return _data
+
+        apply_to_collection(data=tensor, dtype=torch.Tensor, function=_collect)
+        numerics = {key: iter(torch.stack(bufs).cpu().tolist()) for key, bufs in groups.items()}
+        leaf_idx = [0]
+
         def _translate(_data):
+            if _data.is_cuda and (_data.numel() == 1 or reducer is not None):
+                # 两次遍历的顺序一致，按序取回已经同步到 cpu 的数值即可；
+                key = group_keys[leaf_idx[0]]
+                leaf_idx[0] += 1
+                return next(numerics[key])
             if _data.numel() == 1:
                 return _data.item()
-            if reduce is None:
+            if reducer is None:
                 return _data.tolist()
-            return _reduces[reduce](_data).item()
+            return reducer(_data).item()
 
         return apply_to_collection(
             data=tensor,
@@ -165,12 +381,21 @@ class TorchDriver(Driver):
 
         :param filepath: 保存文件的文件位置
         :param only_state_dict: 是否只保存权重
+        :kwargs:
+            * *use_safetensors* (``bool``) -- 是否用 ``safetensors`` 格式保存权重（无 pickle 开销，
+              加载时可以 mmap 零拷贝读取）；需要安装 ``safetensors``，且仅在 ``only_state_dict=True`` 时有效
         :return:
         """
+        self._wait_for_checkpoint_write()
         model = self.unwrap_model()
 
         if only_state_dict:
-            states = {name: param.cpu().detach().clone() for name, param in model.state_dict().items()}
+            states = self._state_dict_to_cpu(model.state_dict())
+            if kwargs.get("use_safetensors", False):
+                save_file, _ = _import_safetensors()
+                # safetensors 只接受 contiguous 的张量；contiguous() 对已经连续的张量是零开销的；
+                save_file({name: tensor.contiguous() for name, tensor in states.items()}, str(filepath))
+                return
             torch.save(states, filepath)
         else:
             if self.model_device is not None:
@@ -182,14 +407,80 @@ class TorchDriver(Driver):
             else:
                 torch.save(model, filepath)
 
+    def _state_dict_to_cpu(self, state_dict):
+        r"""
+        把 ``state_dict`` 中的张量整体搬到 cpu 上。
+
+        gpu 上的张量会被拷贝进一组惰性分配、随 driver 复用的 pinned 内存镜像：逐参数地
+        ``param.cpu().detach().clone()`` 每个参数都要发起一次同步的 ``cudaMemcpy`` 并新分配一块
+        可分页内存，而 pinned 目的端配合 ``non_blocking=True`` 让拷贝真正异步地批量发出，
+        最后统一同步一次即可。
+
+        :param state_dict: :meth:`model.state_dict` 的返回值。
+        :return: 值全部位于 cpu 上的字典。
+        """
+        values = list(state_dict.values())
+        if not any(value.is_cuda for value in values):
+            # 序列化在 save_model 内同步完成，写盘前参数不会被修改，直接保存 detach
+            # 后的视图即可，不必为整个模型再克隆出一份 host 内存；
+            return {name: param.detach() for name, param in state_dict.items()}
+
+        mirrors = self._pinned_state_dict
+        if mirrors is None or list(mirrors.keys()) != list(state_dict.keys()):
+            mirrors = {name: torch.empty_like(param, device="cpu", pin_memory=True)
+                       for name, param in state_dict.items()}
+            self._pinned_state_dict = mirrors
+        if all(value.is_cuda for value in values):
+            self._bulk_copy(list(mirrors.values()), values)
+        else:
+            for mirror, param in zip(mirrors.values(), values):
+                mirror.copy_(param, non_blocking=True)
+        self._sync_src_devices(values)
+        return mirrors
+
+    @staticmethod
+    def _sync_src_devices(srcs):
+        """
+        对 ``srcs`` 中出现过的每个 cuda 设备做一次同步。
+
+        不带参数的 ``torch.cuda.synchronize()`` 只同步当前设备，而单卡 driver 不会调用
+        ``torch.cuda.set_device``，模型完全可能位于非默认卡上——那样拷贝还没落地就会被
+        当作已完成。
+        """
+        for device in {src.device for src in srcs if src.is_cuda}:
+            torch.cuda.synchronize(device)
+
+    @staticmethod
+    def _bulk_copy(dsts, srcs):
+        """
+        批量地将 ``srcs`` 拷贝到 ``dsts``；优先使用 foreach 一次性分发全部拷贝。
+        """
+        if hasattr(torch, "_foreach_copy_"):
+            try:
+                torch._foreach_copy_(dsts, srcs, non_blocking=True)
+                return
+            except TypeError:
+                # 旧版 torch 的 _foreach_copy_ 不接受 non_blocking 参数；
+                pass
+        for dst, src in zip(dsts, srcs):
+            dst.copy_(src, non_blocking=True)
+
     def load_model(self, filepath: Union[Path, str], only_state_dict: bool = True, **kwargs):
         """
         加载模型的函数；将 ``filepath`` 中的模型加载并赋值给当前 ``model`` 。
 
         :param filepath: 保存文件的文件位置
         :param load_state_dict: 保存的内容是否只是权重
+        :kwargs:
+            * *use_safetensors* (``bool``) -- 文件是否为 ``safetensors`` 格式；mmap 方式加载，
+              不经过 pickle，也不会额外物化一份 host 内存
         """
+        self._wait_for_checkpoint_write()
         model = self.unwrap_model()
+        if only_state_dict and kwargs.get("use_safetensors", False):
+            _, load_file = _import_safetensors()
+            model.load_state_dict(load_file(str(filepath), device="cpu"), kwargs.get("strict", True))
+            return
         # todo torch.load 在加载时会使得卡 0 多出一个（甚至多个）model 的显存；因此在多卡断点重训时可能会出现错误；
         res = torch.load(filepath, map_location='cpu')
         if isinstance(res, dict) and only_state_dict is False:
@@ -219,6 +510,9 @@ class TorchDriver(Driver):
         # 传入的 dataloader 参数是 trainer 的 dataloader 属性，因为 driver 的所有 dataloader 我们是不会去改变它的，而是通过改变
         #  trainer.dataloader 来改变 dataloader 的状态，从而适配训练或者评测环境；
 
+        # 上一次的后台写盘任务可能还在途，先等它结束，避免两次保存交错；
+        self._wait_for_checkpoint_write()
+
         # 1. sampler 的状态；
         num_consumed_batches = states.pop('num_consumed_batches')
         states['sampler_states'] = self.get_sampler_state(dataloader, num_consumed_batches)
@@ -239,7 +533,16 @@ class TorchDriver(Driver):
             grad_scaler_state_dict = self.grad_scaler.state_dict()
             states['grad_scaler_state_dict'] = grad_scaler_state_dict
 
-        torch.save(states, Path(folder).joinpath(FASTNLP_CHECKPOINT_FILENAME))
+        # states 中的内容（optimizer / sampler / fp16 的状态）此时都已经在 cpu 上，
+        # pickle 和写盘交给后台线程完成，训练线程在 D2H 拷贝结束后即可继续；
+        _submit_ckpt_write(torch.save, states, Path(folder).joinpath(FASTNLP_CHECKPOINT_FILENAME))
+
+    @staticmethod
+    def _wait_for_checkpoint_write():
+        r"""
+        等待在途的后台 checkpoint 写盘任务完成（若有）；写盘中抛出的异常会在这里重新抛出。
+        """
+        _wait_ckpt_write()
 
     def get_sampler_state(self, dataloader, num_consumed_batches):
         # 因为我们支持 resume training，即精确恢复到具体的一个 batch；
@@ -310,16 +613,74 @@ class TorchDriver(Driver):
         for i in range(len(self.optimizers)):
             optimizer: torch.optim.Optimizer = self.optimizers[i]
             optimizer_state = optimizer.state_dict()
-            optimizer_state["state"] = optimizer_state_to_device(optimizer_state["state"], torch.device("cpu"))
+            if self._overlap_param_optimizers:
+                # overlap_step_with_backward 时传入的 optimizer 从不 step，动量等状态都积累在
+                # 逐参数的 optimizer 里；按全局序号把它们合并回同一个 state_dict，
+                # checkpoint 的格式与普通模式保持一致；
+                for index, param_optimizer in self._overlap_param_optimizers.items():
+                    param_state = param_optimizer.state_dict()["state"]
+                    if 0 in param_state:
+                        optimizer_state["state"][index] = param_state[0]
+            optimizer_state["state"] = self._offload_optimizer_state(optimizer_state["state"], i)
             optimizers_state_dict[f"optimizer{i}"] = optimizer_state  # 注意这里没有使用 deepcopy，测试是不需要的；
         return optimizers_state_dict
 
+    def _offload_optimizer_state(self, state, optimizer_idx):
+        r"""
+        将 optimizer 的 ``state`` 整体搬到 cpu 上。
+
+        与 :func:`optimizer_state_to_device` 逐个 tensor 同步拷贝不同，这里把 gpu 上的状态
+        （如 Adam 的 ``exp_avg`` / ``exp_avg_sq``，总量约为模型参数的两倍）拷贝进按
+        ``(参数, 状态名)`` 缓存并随 driver 复用的 pinned 内存镜像：拷贝 non_blocking 地批量
+        发出，最后统一同步一次，而不是每个小 tensor 都做一次同步的 ``cudaMemcpy``。
+
+        :param state: ``optimizer.state_dict()["state"]``。
+        :param optimizer_idx: optimizer 在 :attr:`optimizers` 中的序号，用于区分镜像缓存。
+        :return: 迁移到 cpu 后的新的 state。
+        """
+        mirrors = self._opt_pinned_mirrors.setdefault(optimizer_idx, {})
+        srcs, dsts = [], []
+        cpu_state = {}
+        for param_key, param_state in state.items():
+            if not isinstance(param_state, dict):
+                cpu_state[param_key] = param_state
+                continue
+            new_param_state = {}
+            for name, value in param_state.items():
+                if isinstance(value, torch.Tensor) and value.is_cuda:
+                    mirror = mirrors.get((param_key, name))
+                    if mirror is None or mirror.shape != value.shape or mirror.dtype != value.dtype:
+                        mirror = torch.empty_like(value, device="cpu", pin_memory=True)
+                        mirrors[(param_key, name)] = mirror
+                    srcs.append(value)
+                    dsts.append(mirror)
+                    new_param_state[name] = mirror
+                elif isinstance(value, torch.Tensor):
+                    new_param_state[name] = value.to("cpu")
+                else:
+                    new_param_state[name] = value
+            cpu_state[param_key] = new_param_state
+        if srcs:
+            self._bulk_copy(dsts, srcs)
+            self._sync_src_devices(srcs)
+        return cpu_state
+
     def load_optimizer_state(self, states):
         assert len(states) == len(self.optimizers), f"The number of optimizers is:{len(self.optimizers)}, while in " \
                                                     f"checkpoint it is:{len(states)}"
         for i in range(len(self.optimizers)):
             optimizer: torch.optim.Optimizer = self.optimizers[i]
             optimizer.load_state_dict(states[f"optimizer{i}"])
+        if self._overlap_param_optimizers:
+            # overlap 模式下恢复到传入 optimizer 的状态不会被使用，需要按全局序号
+            # 拆回真正 step 的逐参数 optimizer；
+            state = states["optimizer0"]["state"]
+            for index, param_optimizer in self._overlap_param_optimizers.items():
+                if index not in state:
+                    continue
+                param_state_dict = param_optimizer.state_dict()
+                param_state_dict["state"] = {0: state[index]}
+                param_optimizer.load_state_dict(param_state_dict)
         logger.debug("Load optimizer state dict.")
 
     def load_checkpoint(self, folder: Path, dataloader, only_state_dict: bool = True, should_load_model: bool = True, **kwargs) -> Dict:
@@ -353,6 +714,8 @@ class TorchDriver(Driver):
                 * drop_last 为 ``True`` 时，等同于 floor(sample_in_this_rank/batch_size) - floor(num_left_samples/batch_size)；
                 * drop_last 为 ``False`` 时，等同于 ceil(sample_in_this_rank/batch_size) - ceil(num_left_samples/batch_size)。
         """
+        # 若上一次保存仍在后台写盘，需要先等其落盘，否则可能读到不完整的文件；
+        self._wait_for_checkpoint_write()
         states = torch.load(folder.joinpath(FASTNLP_CHECKPOINT_FILENAME))
 
         # 1. 加载 optimizers 的状态；
@@ -426,8 +789,9 @@ class TorchDriver(Driver):
         # Spawn distinct SeedSequences for the PyTorch PRNG and the stdlib random module
         torch_ss, stdlib_ss = ss.spawn(2)
         torch.manual_seed(torch_ss.generate_state(1, dtype=np.uint64)[0])
-        # use 128 bits expressed as an integer
-        stdlib_seed = (stdlib_ss.generate_state(2, dtype=np.uint64).astype(object) * [1 << 64, 1]).sum()
+        # use 128 bits expressed as an integer；int.from_bytes 在 C 层一次完成拼接，
+        # 不必经过 object dtype 的大整数乘加；
+        stdlib_seed = int.from_bytes(stdlib_ss.generate_state(4, dtype=np.uint32).tobytes(), "little")
         random.seed(stdlib_seed)
 
     def set_deterministic_dataloader(self, dataloader: "DataLoader"):
@@ -438,6 +802,22 @@ class TorchDriver(Driver):
             dataloader.worker_init_fn = partial(self.worker_init_function,
                                                 rank=int(os.environ.get(FASTNLP_GLOBAL_RANK, 0)))
 
+    def enable_prefetch(self, dataloader: "DataLoader"):
+        """
+        返回一个在独立 cuda stream 上预取下一个 batch 的 dataloader 包装，把 H2D 数据搬运隐藏到
+        上一个 step 的计算之后。仅在数据设备为 cuda 时生效，否则原样返回；建议配合
+        ``DataLoader(pin_memory=True)`` 使用，pageable 内存上的拷贝无法真正异步。
+
+        :param dataloader: 需要包装的 dataloader
+        :return: 包装后的 dataloader；数据设备非 cuda 时为原 dataloader
+        """
+        device = self.data_device
+        if isinstance(device, str):
+            device = torch.device(device)
+        if device is None or device.type != "cuda":
+            return dataloader
+        return _CUDAPrefetchDataLoader(dataloader, device, self.non_blocking)
+
     def set_sampler_epoch(self, dataloader: "DataLoader", cur_epoch_idx: int):
         r"""
         对于分布式的 ``sampler``，需要在每一个 ``epoch`` 前设置随机数种子，来保证每一个进程上的 ``shuffle`` 是一样的。
@@ -452,19 +832,20 @@ class TorchDriver(Driver):
     @staticmethod
     def get_dataloader_args(dataloader: "DataLoader"):
         """
-        从 ``dataloader`` 中获取参数 ``dataset``, ``batch_sampler``, ``sampler``, ``batch_size``, ``shuffle`` 
-        和 ``drop_last`` 。
+        从 ``dataloader`` 中获取参数 ``dataset``, ``batch_sampler``, ``sampler``, ``batch_size``, ``shuffle``
+        和 ``drop_last`` 。解析需要递归探查 sampler / batch_sampler 的属性，结果按 dataloader
+        实例缓存；fastNLP 在需要改变 sampler 时总是重建新的 dataloader，因此缓存不会失效。
         """
-        @dataclass
-        class Res:
-            dataset: Optional[Dataset] = None
-            batch_sampler: Optional[BatchSampler] = None
-            sampler: Optional[Sampler] = None
-            batch_size: Optional[int] = None
-            shuffle: Optional[bool] = None
-            drop_last: Optional[bool] = None
+        try:
+            return _dataloader_args_cache[dataloader]
+        except KeyError:
+            # 尚未缓存，正常解析一次并在函数结尾处写入缓存；
+            cacheable = True
+        except TypeError:
+            # 自定义的 dataloader 可能不支持弱引用；
+            cacheable = False
 
-        res = Res()
+        res = _DataLoaderArgs()
 
         # pytorch 的 DataLoader 一定会有 dataset 属性；
         res.dataset = dataloader.dataset
@@ -477,30 +858,32 @@ class TorchDriver(Driver):
             res.drop_last = False
         # dataloader 使用的是 batch_sampler；
         else:
-            res.batch_sampler = dataloader.batch_sampler
-            if hasattr(dataloader.batch_sampler, "batch_size"):
-                res.batch_size = getattr(dataloader.batch_sampler, "batch_size")
+            batch_sampler = dataloader.batch_sampler
+            res.batch_sampler = batch_sampler
+            if hasattr(batch_sampler, "batch_size"):
+                res.batch_size = batch_sampler.batch_size
             # 用户使用的是自己的 batch_sampler 并且其没有 "batch_size" 属性；
             else:
                 dataloader_iter = iter(dataloader)
                 pre_sample = next(dataloader_iter)
                 res.batch_size = pre_sample.shape[0]
 
-            if hasattr(dataloader.batch_sampler, "sampler"):
-                res.sampler = dataloader.batch_sampler.sampler
-                if hasattr(dataloader.batch_sampler.sampler, "shuffle"):
-                    res.shuffle = dataloader.batch_sampler.sampler.shuffle
-                elif isinstance(dataloader.batch_sampler.sampler, TorchRandomSampler):
+            if hasattr(batch_sampler, "sampler"):
+                sampler = batch_sampler.sampler
+                res.sampler = sampler
+                if hasattr(sampler, "shuffle"):
+                    res.shuffle = sampler.shuffle
+                elif isinstance(sampler, TorchRandomSampler):
                     res.shuffle = True
                 else:
                     res.shuffle = False
             # ReproduceBatchSampler 的情况
-            elif hasattr(dataloader.batch_sampler, "batch_sampler"):
-                batch_sampler = dataloader.batch_sampler.batch_sampler
-                res.sampler = batch_sampler.sampler
-                if hasattr(batch_sampler.sampler, "shuffle"):
-                    res.shuffle = dataloader.batch_sampler.sampler.shuffle
-                elif isinstance(batch_sampler.sampler, TorchRandomSampler):
+            elif hasattr(batch_sampler, "batch_sampler"):
+                sampler = batch_sampler.batch_sampler.sampler
+                res.sampler = sampler
+                if hasattr(sampler, "shuffle"):
+                    res.shuffle = sampler.shuffle
+                elif isinstance(sampler, TorchRandomSampler):
                     res.shuffle = True
                 else:
                     res.shuffle = False
@@ -510,10 +893,12 @@ class TorchDriver(Driver):
                 res.sampler = dataloader.sampler
                 res.shuffle = False
 
-            if hasattr(dataloader.batch_sampler, "drop_last"):
-                res.drop_last = getattr(dataloader.batch_sampler, "drop_last")
+            if hasattr(batch_sampler, "drop_last"):
+                res.drop_last = batch_sampler.drop_last
             # 用户使用的是自己的 batch_sampler 并且其没有 "drop_last" 属性；
             else:
                 res.drop_last = False
 
+        if cacheable:
+            _dataloader_args_cache[dataloader] = res
         return res
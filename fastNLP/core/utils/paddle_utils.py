@@ -63,7 +63,8 @@ def _convert_data_device(device: Union[str, int]) -> str:
 
 
 def paddle_to(data: "paddle.Tensor", device: Union[str, int, 'paddle.fluid.core_avx.Place',
-                                                   'paddle.CPUPlace', 'paddle.CUDAPlace']) -> "paddle.Tensor":
+                                                   'paddle.CPUPlace', 'paddle.CUDAPlace'],
+              blocking: bool = True) -> "paddle.Tensor":
     """
     将 ``data`` 迁移到指定的 ``device`` 上。:class:`paddle.Tensor` 没有类似 :meth:`torch.Tensor.to` 的函数来迁移张量，
     因此该函数只是集成了 :func:`paddle.Tensor.cpu` 和 :func:`paddle.Tensor.cuda` 两个函数。
@@ -71,13 +72,15 @@ def paddle_to(data: "paddle.Tensor", device: Union[str, int, 'paddle.fluid.core_
     :param data: 要迁移的张量；
     :param device: 目标设备，可以是 ``str`` 或 ``int`` 及 **paddle** 自己的 :class:`paddle.fluid.core_avx.Place`、
         :class:`paddle.CPUPlace` 和 :class:`paddle.CUDAPlace` 类型；
+    :param blocking: 迁移到 ``gpu`` 时是否同步等待拷贝完成；传入 ``False`` 时拷贝异步发起，
+        后续在同一计算流上的算子仍会按顺序执行，因此不影响正确性；
     :return: 迁移后的张量；
     """
     if isinstance(device, paddle.fluid.core_avx.Place):
         if device.is_cpu_place():
             return data.cpu()
         else:
-            return data.cuda(device.gpu_device_id())
+            return data.cuda(device.gpu_device_id(), blocking)
     elif isinstance(device, paddle.CPUPlace):
         return data.cpu()
     elif isinstance(device, paddle.CUDAPlace):
@@ -85,7 +88,7 @@ def paddle_to(data: "paddle.Tensor", device: Union[str, int, 'paddle.fluid.core_
     elif device == "cpu":
         return data.cpu()
     else:
-        return data.cuda(get_paddle_device_id(device))
+        return data.cuda(get_paddle_device_id(device), blocking)
 
 
 def get_paddle_gpu_str(device: Union[str, int]) -> str:
@@ -139,20 +142,21 @@ def get_paddle_device_id(device: Union[str, int]) -> int:
 
     return device_id
 
-def paddle_move_data_to_device(batch: Any, device: Optional[Union[str, int]]) -> Any:
+def paddle_move_data_to_device(batch: Any, device: Optional[Union[str, int]], blocking: bool = True) -> Any:
     r"""
     将 **paddle** 的数据集合传输到给定设备。只有 :class:`paddle.Tensor` 对象会被传输到设备中，其余保持不变。
 
     :param batch: 需要进行迁移的数据集合；
     :param device: 目标设备。可以是显卡设备的编号，或是``cpu``, ``gpu`` 或 ``gpu:x`` 格式的字符串；
         当这个参数为 `None`` 时，不会执行任何操作。
+    :param blocking: 迁移到 ``gpu`` 时是否同步等待拷贝完成，详见 :func:`paddle_to`；
     :return: 迁移到新设备上的数据集合；
     """
     if device is None:
         return batch
 
     def batch_to(data: Any) -> Any:
-        return paddle_to(data, device)
+        return paddle_to(data, device, blocking)
 
     return apply_to_collection(batch, dtype=paddle.Tensor, function=batch_to)
 
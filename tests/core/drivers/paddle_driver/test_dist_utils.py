@@ -1,3 +1,4 @@
+import io
 import os
 import sys
 import signal
@@ -11,6 +12,9 @@ from fastNLP.core.drivers.paddle_driver.dist_utils import (
     _object_to_tensor,
     fastnlp_paddle_all_gather,
     fastnlp_paddle_broadcast_object,
+    paddle_pickle_dump,
+    paddle_pickle_load,
+    _OOB_MAGIC,
 )
 from fastNLP.core.drivers.paddle_driver.fleet_launcher import FleetLauncher
 from tests.helpers.utils import magic_argv_env_context
@@ -19,6 +23,39 @@ if _NEED_IMPORT_PADDLE:
     import paddle
     import paddle.distributed as dist
 
+@pytest.mark.paddle
+def test_paddle_pickle_dump_load_state_dict():
+    """
+    测试 state_dict 经过 paddle_pickle_dump 的分帧格式后能被 paddle_pickle_load 原样读回
+    """
+    state_dict = {"weight": paddle.rand((4, 8)).cpu(), "bias": paddle.rand((8,)).cpu()}
+    stream = io.BytesIO()
+    paddle_pickle_dump(state_dict, stream, protocol=2)
+    data = stream.getvalue()
+    if sys.version_info >= (3, 8):
+        # python>=3.8 时 state_dict 走 protocol 5 的分帧路径，流以魔数开头
+        assert data[:len(_OOB_MAGIC)] == _OOB_MAGIC
+    loaded = paddle_pickle_load(data)
+
+    assert set(loaded.keys()) == set(state_dict.keys())
+    for name, tensor in state_dict.items():
+        value = loaded[name]
+        if isinstance(value, paddle.Tensor):
+            value = value.numpy()
+        np.testing.assert_array_equal(np.asarray(value), tensor.numpy())
+
+@pytest.mark.paddle
+def test_paddle_pickle_dump_load_plain_object():
+    """
+    测试非 state_dict 的对象走普通 pickle 路径时的往返
+    """
+    obj = {"accuracy": 0.9, "history": [1, 2, 3], "name": "test"}
+    stream = io.BytesIO()
+    paddle_pickle_dump(obj, stream, protocol=2)
+    data = stream.getvalue()
+    assert data[:len(_OOB_MAGIC)] != _OOB_MAGIC
+    assert paddle_pickle_load(data) == obj
+
 @pytest.mark.paddledist
 class TestDistUtilsTools:
     """
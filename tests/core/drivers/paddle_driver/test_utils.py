@@ -1,8 +1,11 @@
 import pytest
+import numpy as np
 
 from fastNLP.core.drivers.paddle_driver.utils import (
     replace_batch_sampler,
     replace_sampler,
+    _save_tensor_dict_mmap,
+    _load_tensor_dict_mmap,
 )
 from fastNLP.core.samplers import ReproduceBatchSampler, RandomSampler
 from fastNLP.envs.imports import _NEED_IMPORT_PADDLE
@@ -36,4 +39,28 @@ def test_replace_sampler():
 
     assert not (replaced_loader is dataloader)
     assert isinstance(replaced_loader.batch_sampler, BatchSampler)
-    assert isinstance(replaced_loader.batch_sampler.sampler, RandomSampler)
\ No newline at end of file
+    assert isinstance(replaced_loader.batch_sampler.sampler, RandomSampler)
+
+@pytest.mark.paddle
+def test_tensor_dict_mmap_save_load(tmp_path):
+    """
+    测试 _save_tensor_dict_mmap 保存的文件能被 _load_tensor_dict_mmap 原样读回
+    """
+    state_dict = {
+        "weight": paddle.rand((4, 8)),
+        # 非连续张量，保存时按 C 序导出
+        "transposed": paddle.transpose(paddle.rand((3, 6)), [1, 0]),
+        # 0-d 张量
+        "scalar": paddle.to_tensor(3.14),
+        "ints": paddle.arange(10),
+    }
+    filepath = str(tmp_path / "state_dict.fnlp")
+    _save_tensor_dict_mmap(filepath, state_dict)
+    loaded = _load_tensor_dict_mmap(filepath)
+
+    assert set(loaded.keys()) == set(state_dict.keys())
+    for name, tensor in state_dict.items():
+        arr = tensor.numpy()
+        assert loaded[name].dtype == arr.dtype
+        assert tuple(loaded[name].shape) == tuple(arr.shape)
+        np.testing.assert_array_equal(loaded[name], arr)
\ No newline at end of file
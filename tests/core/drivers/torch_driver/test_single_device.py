@@ -566,6 +566,27 @@ def test_save_and_load_model(only_state_dict):
     finally:
         rank_zero_rm(path)
 
+@pytest.mark.torch
+def test_save_and_load_model_safetensors():
+    """
+    测试 use_safetensors=True 时 save_model 和 load_model 的往返
+    """
+    pytest.importorskip("safetensors")
+    try:
+        path = "model.safetensors"
+        driver1, driver2 = generate_random_driver(20, 1), generate_random_driver(20, 1)
+
+        driver1.save_model(path, only_state_dict=True, use_safetensors=True)
+        driver2.load_model(path, only_state_dict=True, use_safetensors=True)
+
+        state1 = driver1.model.state_dict()
+        state2 = driver2.model.state_dict()
+        assert set(state1.keys()) == set(state2.keys())
+        for name in state1:
+            assert torch.equal(state1[name], state2[name])
+    finally:
+        rank_zero_rm(path)
+
 @pytest.mark.torch
 @pytest.mark.parametrize("only_state_dict", ([True, False]))
 @pytest.mark.parametrize("fp16", ([True, False]))